@@ -1,3 +1,7 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from passlib.context import CryptContext
@@ -5,13 +9,28 @@ from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 import database
+from cache import TTLCache
 
 SECRET_KEY = "secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# AUTH CACHES
+USER_CACHE_TTL = 60  # seconds a resolved user row is reused
+USER_CACHE_MAX_ENTRIES = 1024
+TOKEN_CACHE_MAX_ENTRIES = 4096
+
+token_cache = TTLCache(TOKEN_CACHE_MAX_ENTRIES)  # token -> email, until the token expires
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES)  # email -> user row
+
+# PASSWORD HASHING CONFIGS
+BCRYPT_ROUNDS = 12  # cost; existing hashes at another cost are rehashed on login
+HASH_WORKERS = 2  # threads dedicated to bcrypt (it releases the GIL)
+HASH_QUEUE_LIMIT = 32  # hash jobs running + waiting before new ones get a 429
+HASH_RETRY_AFTER = 1  # seconds suggested to clients that got a 429
+
 #hash password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 def get_password_hash(password: str) -> str:
@@ -22,6 +41,58 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """check password with its hashed ver. """
     return pwd_context.verify(plain_password, hashed_password)
 
+# PASSWORD HASH EXECUTOR
+# bcrypt runs here instead of the shared request threadpool, so login bursts only queue behind each other
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_jobs = 0  # running + queued, until the executor finishes or drops the job
+_hash_jobs_lock = threading.Lock()  # jobs finish on the executor threads
+hash_rejected = 0
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """executor for bcrypt calls, created on first use (again after a shutdown)"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+    return _hash_executor
+
+def shutdown_hash_executor():
+    """drop queued hash jobs and release the executor (app shutdown)"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+def _hash_job_done(_):
+    global _hash_jobs
+    with _hash_jobs_lock:
+        _hash_jobs -= 1
+
+async def run_hash_job(func, *args):
+    """ run a bcrypt call on the hash executor, 429 when the queue is full
+    a job counts against the queue until it actually finishes, even if its caller went away """
+    global _hash_jobs, hash_rejected
+    with _hash_jobs_lock:
+        if _hash_jobs >= HASH_QUEUE_LIMIT:
+            hash_rejected += 1
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many login attempts in progress",
+                                headers={"Retry-After": str(HASH_RETRY_AFTER)})
+        _hash_jobs += 1
+    try:
+        future = get_hash_executor().submit(func, *args)
+    except Exception:
+        _hash_job_done(None)
+        raise
+    future.add_done_callback(_hash_job_done)
+    return await asyncio.wrap_future(future)
+
+async def hash_password(password: str) -> str:
+    """ get_password_hash on the hash executor """
+    return await run_hash_job(get_password_hash, password)
+
+def hash_stats() -> dict:
+    return {"workers": HASH_WORKERS, "jobs": _hash_jobs, "queue_limit": HASH_QUEUE_LIMIT,
+            "rejected": hash_rejected, "bcrypt_rounds": BCRYPT_ROUNDS}
+
 def create_access_token(user_email: str, expires_delta: Optional[timedelta] = None) -> str:
     """ create JWT access token """
     to_encode = {"sub": user_email}
@@ -31,34 +102,57 @@ def create_access_token(user_email: str, expires_delta: Optional[timedelta] = No
     return token
 
 def verify_token(token: str) -> str:
-    """ decode token, return email """
+    """ decode token, return email (decoded tokens are cached until they expire) """
+    email, _ = token_cache.get(token)
+    if email is not None:
+        return email
     try:
         # decode token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")  # "sub" -> user
         if email is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        return email 
     except JWTError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(token, email, expires_in)
+    return email
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
     """ get user from a JWT token """
     # verify token
     email = verify_token(token)
-    # look up user
-    user = database.get_user_by_email(email)
+    # look up user (cached briefly)
+    user, _ = user_cache.get(email)
     if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user = database.get_user_by_email(email)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user_cache.set(email, user, USER_CACHE_TTL)
     return user #tuple
 
-def authenticate_user(email: str, password: str):
-    """ authenticate user with email and password """
+def invalidate_user(email: str):
+    """ drop a cached user after it changes """
+    user_cache.delete(email)
+
+def clear_auth_caches():
+    """ forget cached tokens and users (app shutdown; a restart may point at another database) """
+    token_cache.clear()
+    user_cache.clear()
+
+async def authenticate_user(email: str, password: str):
+    """ authenticate user with email and password, rehashing it if the bcrypt cost changed """
     # get
-    user = database.get_user_by_email(email)
+    user = await asyncio.to_thread(database.get_user_by_email, email)
     if not user:
         return False
     # check password
-    if not verify_password(password, user[3]):
+    valid, new_hash = await run_hash_job(pwd_context.verify_and_update, password, user[3])
+    if not valid:
         return False
+    if new_hash:
+        await asyncio.to_thread(database.update_user_password, user[0], new_hash)
+        invalidate_user(email)
     return user #tuple
\ No newline at end of file
@@ -0,0 +1,202 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+# entry states returned by TTLCache.get
+FRESH = "fresh"
+STALE = "stale"
+
+
+class CacheEntry:
+    """cached value with its freshness deadlines (monotonic seconds)"""
+    __slots__ = ("value", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class TTLCache:
+    """bounded in-memory cache with per-entry TTL, a stale window and LRU eviction (thread-safe)
+        *ttl: seconds an entry is served as fresh
+        *stale_ttl: extra seconds it may still be served (as stale) while it is refreshed
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # sync endpoints share caches across threadpool workers
+
+    def get(self, key: Hashable) -> Tuple[Any, Optional[str]]:
+        """return (value, FRESH | STALE) or (None, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is None or now >= entry.stale_until:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None, None
+
+            self._entries.move_to_end(key)  # most recently used
+            if now < entry.expires_at:
+                self.hits += 1
+                return entry.value, FRESH
+            self.stale_hits += 1
+            return entry.value, STALE
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0):
+        """store value, evicting least recently used entries past max_size"""
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = CacheEntry(value, now + ttl, now + ttl + stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def remaining(self, key: Hashable) -> Optional[float]:
+        """seconds until key goes stale (<= 0 once stale), None if absent; no stats/LRU update"""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or now >= entry.stale_until:
+            return None
+        return entry.expires_at - now
+
+    def peek(self, key: Hashable) -> Any:
+        """value if present and not past its stale window, else None; no stats/LRU update"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry.stale_until:
+            return None
+        return entry.value
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """hit/miss counters for monitoring"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0
+        }
+
+
+class DiskCache:
+    """sqlite-backed cache shared by all worker processes and kept across restarts
+        keys and values must be JSON serializable; deadlines are wall-clock epoch seconds
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, timeout: float = 5, trim_every: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.trim_every = trim_every  # writes (per process) between expiry / size trims
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")  # workers read while one writes
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    stale_until REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_stale_until ON cache_entries (stale_until)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float, float]]:
+        """return (value, expires_at, stale_until) or None if missing / past its stale window"""
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT value, expires_at, stale_until FROM cache_entries WHERE key = ? AND stale_until > ?",
+                    (self._key(key), time.time())
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Disk cache error: {e}")
+                return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0):
+        """store value; every trim_every writes also drop expired entries and the oldest past max_entries
+        (so the table may run up to trim_every rows per worker over max_entries between trims)"""
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stale_until) VALUES (?, ?, ?, ?)",
+                        (self._key(key), json.dumps(value), now + ttl, now + ttl + stale_ttl)
+                    )
+                    self._writes += 1
+                    if self._writes % self.trim_every == 0:
+                        self._trim(conn, now)
+            except sqlite3.Error as e:
+                print(f"Disk cache error: {e}")
+
+    def _trim(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM cache_entries WHERE stale_until <= ?", (now,))
+        conn.execute('''
+            DELETE FROM cache_entries WHERE key IN (
+                SELECT key FROM cache_entries ORDER BY stale_until
+                LIMIT MAX(0, (SELECT COUNT(*) FROM cache_entries) - ?)
+            )
+        ''', (self.max_entries,))
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM cache_entries")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            try:
+                size = self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            except sqlite3.Error:
+                size = None
+        return {"size": size, "max_entries": self.max_entries}
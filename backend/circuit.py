@@ -0,0 +1,81 @@
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """per-upstream circuit breaker over a sliding failure-rate window
+        *window: seconds of call history considered
+        *min_calls: calls needed in the window before the breaker may open
+        *failure_rate: failed fraction of calls that opens the breaker
+        *cooldown: seconds to fail fast before letting one trial call through
+    """
+
+    def __init__(self, name: str, window: float = 60, min_calls: int = 5,
+                 failure_rate: float = 0.5, cooldown: float = 30):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._results = deque()  # (timestamp, ok)
+        self._trial_in_flight = False
+
+    def _prune(self, now: float):
+        while self._results and now - self._results[0][0] > self.window:
+            self._results.popleft()
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        self._results.clear()
+        print(f"Circuit open: {self.name}")
+
+    def allow(self) -> bool:
+        """whether a call may go upstream now (False = fail fast)"""
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.cooldown:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record(self, ok: bool):
+        """record the outcome of an allowed call"""
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            if ok:
+                self.state = CLOSED
+                print(f"Circuit closed: {self.name}")
+            else:
+                self._open(now)
+            return
+
+        self._results.append((now, ok))
+        self._prune(now)
+        failures = sum(1 for _, result in self._results if not result)
+        if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+            self._open(now)
+
+    def stats(self) -> dict:
+        self._prune(time.monotonic())
+        return {
+            "state": self.state,
+            "calls_in_window": len(self._results),
+            "failures_in_window": sum(1 for _, result in self._results if not result),
+            "rejected": self.rejected
+        }
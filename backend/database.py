@@ -1,115 +1,804 @@
+import base64
+import json
+import math
+import queue
+import re
 import sqlite3
-from typing import List, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
 DB_NAME = "waveminder.db"
+POOL_SIZE = 5  # max open read-only connections
+POOL_TIMEOUT = 5  # seconds to wait for a free connection / locked db
+WRITE_TIMEOUT = 10  # seconds a writer waits for the single writer connection
+MIN_SQLITE_VERSION = (3, 35, 0)  # INSERT ... RETURNING
 
+# STORAGE CONFIG
+# persistent, database-level settings (set once by the writer)
+JOURNAL_MODE = "WAL"  # readers never block on the writer and vice versa
 
-# DATABASE CONNECTION & INITIALIZATION
-def get_db():
-    """get database connection with row factory"""
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row  # access columns by name
-    return conn
+# applied once when a pooled connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",  # safe with WAL, fsync only at checkpoints
+    "PRAGMA cache_size = -16000",  # ~16MB page cache per connection
+    "PRAGMA mmap_size = 268435456",  # 256MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",  # sorts/temp b-trees off disk
+)
 
-def execute_query(query: str, params: tuple = (), fetch_one: bool = False, commit: bool = False):
-    """query executor"""
-    conn = get_db()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(query, params)
-        if commit:
-            conn.commit()
-            result = cursor.lastrowid if cursor.lastrowid else True
+
+EARTH_RADIUS_KM = 6371.0
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[float]:
+    """great-circle (haversine) distance, also registered as the sql function distance_km"""
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# CONNECTION POOL
+class ConnectionPool:
+    """bounded pool of long-lived sqlite connections"""
+
+    def __init__(self, db_name: str, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT,
+                 readonly: bool = False):
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self.readonly = readonly
+        self._idle = queue.LifoQueue(maxsize=size)  # reuse the warmest connection first
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """open a new connection and apply per-connection setup"""
+        if self.readonly:
+            uri = Path(self.db_name).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.timeout, check_same_thread=False)
         else:
-            result = cursor.fetchone() if fetch_one else cursor.fetchall()
-        return result
-    except Exception as e:
-        print(f"Database error: {e}")
-        conn.rollback()
-        return None if fetch_one or commit else []
+            conn = sqlite3.connect(self.db_name, timeout=self.timeout, check_same_thread=False)
+            conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+        conn.row_factory = sqlite3.Row  # access columns by name
+        conn.create_function("distance_km", 4, distance_km, deterministic=True)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """cheap liveness check before handing a connection out"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """take an idle connection, open a new one, or wait for one to be released"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise sqlite3.OperationalError("connection pool exhausted")
+
+        if not self._is_healthy(conn):
+            self._discard(conn)
+            return self.acquire()
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """return connection to the pool, rolling back anything left open"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            self._discard(conn)
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def close(self):
+        """close all idle connections"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+# reads share a pool of read-only connections, writes serialize through one writer
+_pools: dict = {}
+_pool_lock = threading.Lock()
+
+def get_pool(readonly: bool = False) -> ConnectionPool:
+    """shared reader/writer pool for DB_NAME (recreated if DB_NAME changes)"""
+    with _pool_lock:
+        pool = _pools.get(readonly)
+        if pool is None or pool.db_name != DB_NAME:
+            if pool is not None:
+                pool.close()
+            if readonly:
+                pool = ConnectionPool(DB_NAME, readonly=True)
+            else:
+                pool = ConnectionPool(DB_NAME, size=1, timeout=WRITE_TIMEOUT)
+            _pools[readonly] = pool
+        return pool
+
+def close_pool():
+    """close pooled connections (app shutdown)"""
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+# DATABASE CONNECTION & INITIALIZATION
+@contextmanager
+def get_db(readonly: bool = False):
+    """borrow a pooled database connection with row factory
+        *readonly: use a read-only connection instead of the single writer
+    """
+    pool = get_pool(readonly)
+    conn = pool.acquire()
+    try:
+        yield conn
     finally:
-        conn.close()
+        pool.release(conn)
+
+def execute_query(query: str, params: tuple = (), fetch_one: bool = False, commit: bool = False):
+    """query executor (reads go to read-only connections, commits to the writer)
+        *commit + fetch_one: return the row of a write's RETURNING clause
+    """
+    with get_db(readonly=not commit) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            if commit:
+                returned = cursor.fetchone() if fetch_one else None  # read before the commit
+                conn.commit()
+                result = returned if fetch_one else (cursor.lastrowid if cursor.lastrowid else True)
+            else:
+                result = cursor.fetchone() if fetch_one else cursor.fetchall()
+            return result
+        except Exception as e:
+            print(f"Database error: {e}")
+            conn.rollback()
+            return None if fetch_one or commit else []
+        finally:
+            cursor.close()
 
 def init_database():
     """initialize all database tables"""
-    conn = get_db()
-    cursor = conn.cursor()
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise RuntimeError(f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))}+ is required, "
+                           f"this Python links SQLite {sqlite3.sqlite_version}")
+    with get_db() as conn:
+        cursor = conn.cursor()
     
-    # USERS TABLE
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            name TEXT NOT NULL,
-            password TEXT NOT NULL,
-            location TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        # USERS TABLE
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                password TEXT NOT NULL,
+                location TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
     
-    # MARINE SIGHTINGS TABLE
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS marine_sightings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            species_name TEXT NOT NULL,
-            species_type TEXT NOT NULL,
-            location_name TEXT,
-            latitude REAL,
-            longitude REAL,
-            date_spotted DATE NOT NULL,
-            time_spotted TEXT,
-            group_size INTEGER DEFAULT 1,
-            behavior TEXT, 
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-    ''')
+        # MARINE SIGHTINGS TABLE
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS marine_sightings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                species_name TEXT NOT NULL,
+                species_type TEXT NOT NULL,
+                location_name TEXT,
+                latitude REAL,
+                longitude REAL,
+                date_spotted DATE NOT NULL,
+                time_spotted TEXT,
+                group_size INTEGER DEFAULT 1,
+                behavior TEXT, 
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        ''')
     
-    # BEACH REPORTS TABLE
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS beach_reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            beach_name TEXT NOT NULL,
-            latitude REAL,
-            longitude REAL,
-            water_quality INTEGER,
-            pollution_level INTEGER,
-            water_temp REAL,
-            wildlife_activity TEXT,
-            weather_conditions TEXT,
-            notes TEXT,
-            report_date DATE NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-    ''')
+        # BEACH REPORTS TABLE
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS beach_reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                beach_name TEXT NOT NULL,
+                latitude REAL,
+                longitude REAL,
+                water_quality INTEGER,
+                pollution_level INTEGER,
+                water_temp REAL,
+                wildlife_activity TEXT,
+                weather_conditions TEXT,
+                notes TEXT,
+                report_date DATE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        ''')
+    
+        # CONSERVATION ACTIONS TABLE
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS conservation_actions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                action_type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                location_name TEXT,
+                latitude REAL,
+                longitude REAL,
+                participants INTEGER DEFAULT 1,
+                waste_collected REAL DEFAULT 0,
+                area_covered REAL DEFAULT 0,
+                date_completed DATE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        ''')
     
-    # CONSERVATION ACTIONS TABLE
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS conservation_actions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
+        conn.commit()
+        run_migrations(conn)
+    print("Database initialized")
+
+
+# SCHEMA MIGRATIONS
+# (version, description, statements) - append only, never edit a shipped step
+# community stats counters: rebuilt from conservation_actions (migration + drift repair)
+COMMUNITY_STATS_REBUILD = (
+    "DELETE FROM community_stats",
+    '''
+    INSERT INTO community_stats (id, total_actions, total_participants, total_waste, total_area)
+    SELECT 1, COUNT(*), COALESCE(SUM(participants), 0), COALESCE(SUM(waste_collected), 0),
+           COALESCE(SUM(area_covered), 0)
+    FROM conservation_actions
+    ''',
+    "DELETE FROM action_type_counts",
+    '''
+    INSERT INTO action_type_counts (action_type, count)
+    SELECT action_type, COUNT(*) FROM conservation_actions GROUP BY action_type
+    ''',
+)
+
+# time-bucketed rollups: (table, source, date column, dimension, {measure: per-row value})
+# tables and triggers are created by migration 3; changing a definition needs a new migration
+ROLLUP_BUCKETS = {
+    "day": "date({0})",
+    "week": "date({0}, 'weekday 0', '-6 days')",  # monday of the week
+}
+
+# mirrors main.calculate_beach_quality (NULL when the inputs are missing)
+BEACH_QUALITY_SQL = """ROUND(MIN(5.0, MAX(1.0, {0}.water_quality * 0.4 + {0}.pollution_level * 0.5 +
+    CASE {0}.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2)"""
+
+ROLLUPS = {
+    "sightings": ("sighting_rollups", "marine_sightings", "date_spotted", "species_type", {
+        "sightings": "1",
+        "individuals": "COALESCE({0}.group_size, 1)",
+    }),
+    "beach_quality": ("beach_quality_rollups", "beach_reports", "report_date", "beach_name", {
+        "reports": "1",
+        "quality_sum": "COALESCE(" + BEACH_QUALITY_SQL + ", 0)",
+        "quality_count": "(" + BEACH_QUALITY_SQL + " IS NOT NULL)",
+    }),
+    "conservation": ("action_rollups", "conservation_actions", "date_completed", "action_type", {
+        "actions": "1",
+        "participants": "COALESCE({0}.participants, 0)",
+        "waste_collected": "COALESCE({0}.waste_collected, 0)",
+        "area_covered": "COALESCE({0}.area_covered, 0)",
+    }),
+}
+
+def _rollup_rebuild(rollup: tuple) -> tuple:
+    """statements recomputing one rollup table (a ROLLUPS value) from its source rows"""
+    table, source, date_col, dim, measures = rollup
+    columns = ", ".join(measures)
+    statements = [f"DELETE FROM {table}"]
+    for granularity, bucket in ROLLUP_BUCKETS.items():
+        sums = ", ".join(f"SUM({value.format('s')})" for value in measures.values())
+        statements.append(f'''
+            INSERT INTO {table} (granularity, bucket, {dim}, {columns})
+            SELECT '{granularity}', {bucket.format('s.' + date_col)}, s.{dim}, {sums}
+            FROM {source} s GROUP BY 2, 3
+        ''')
+    return tuple(statements)
+
+# r*tree point index per table with coordinates: table -> (query alias, rtree table)
+SPATIAL_INDEXES = {
+    "marine_sightings": ("ms", "sightings_rtree"),
+    "beach_reports": ("br", "reports_rtree"),
+    "conservation_actions": ("ca", "actions_rtree"),
+}
+
+def _spatial_index_schema(table: str) -> tuple:
+    """r*tree over the rows' coordinates, kept in sync by triggers and filled from existing rows"""
+    _, rtree = SPATIAL_INDEXES[table]
+    located = "{0}.latitude IS NOT NULL AND {0}.longitude IS NOT NULL"
+    insert = (f"INSERT INTO {rtree} (id, min_lat, max_lat, min_lon, max_lon) "
+              "VALUES ({0}.id, {0}.latitude, {0}.latitude, {0}.longitude, {0}.longitude)")
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree (id, min_lat, max_lat, min_lon, max_lon)",
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{rtree}_insert AFTER INSERT ON {table}
+        WHEN {located.format("NEW")}
+        BEGIN
+            {insert.format("NEW")};
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{rtree}_delete AFTER DELETE ON {table}
+        BEGIN
+            DELETE FROM {rtree} WHERE id = OLD.id;
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{rtree}_update AFTER UPDATE OF latitude, longitude ON {table}
+        BEGIN
+            DELETE FROM {rtree} WHERE id = OLD.id;
+            INSERT INTO {rtree} (id, min_lat, max_lat, min_lon, max_lon)
+                SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+                WHERE {located.format("NEW")};
+        END
+        ''',
+        f"DELETE FROM {rtree}",
+        f"INSERT INTO {rtree} (id, min_lat, max_lat, min_lon, max_lon) "
+        f"SELECT id, latitude, latitude, longitude, longitude FROM {table} t WHERE {located.format('t')}",
+    )
+
+# full-text search: kind -> (table, fts table, indexed columns, title column, date column)
+SEARCH_INDEXES = {
+    "sightings": ("marine_sightings", "sightings_fts",
+                  ("species_name", "location_name", "behavior", "notes"), "species_name", "date_spotted"),
+    "beach_reports": ("beach_reports", "reports_fts", ("beach_name", "notes"), "beach_name", "report_date"),
+    "conservation_actions": ("conservation_actions", "actions_fts",
+                             ("title", "description", "location_name"), "title", "date_completed"),
+}
+
+def _search_index_schema(kind: str) -> tuple:
+    """external-content fts5 index over a table, kept in sync by triggers and built from existing rows"""
+    table, fts, columns, _, _ = SEARCH_INDEXES[kind]
+    names = ", ".join(columns)
+    new = ", ".join(f"NEW.{c}" for c in columns)
+    old = ", ".join(f"OLD.{c}" for c in columns)
+    return (
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5 (
+            {names}, content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts} (rowid, {names}) VALUES (NEW.id, {new});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', OLD.id, {old});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {names} ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', OLD.id, {old});
+            INSERT INTO {fts} (rowid, {names}) VALUES (NEW.id, {new});
+        END
+        ''',
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    )
+
+MIGRATIONS = [
+    (1, "indexes for list, per-user and join access paths", (
+        "CREATE INDEX IF NOT EXISTS idx_sightings_date ON marine_sightings (date_spotted, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_sightings_user_date ON marine_sightings (user_id, date_spotted, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_reports_date ON beach_reports (report_date)",
+        "CREATE INDEX IF NOT EXISTS idx_reports_user_date ON beach_reports (user_id, report_date)",
+        "CREATE INDEX IF NOT EXISTS idx_actions_date ON conservation_actions (date_completed)",
+        "CREATE INDEX IF NOT EXISTS idx_actions_user_date ON conservation_actions (user_id, date_completed)",
+    )),
+    (2, "community stats counters maintained by triggers", (
+        '''
+        CREATE TABLE IF NOT EXISTS community_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_actions INTEGER NOT NULL DEFAULT 0,
+            total_participants INTEGER NOT NULL DEFAULT 0,
+            total_waste REAL NOT NULL DEFAULT 0,
+            total_area REAL NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS action_type_counts (
+            action_type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_actions_stats_insert AFTER INSERT ON conservation_actions
+        BEGIN
+            UPDATE community_stats SET
+                total_actions = total_actions + 1,
+                total_participants = total_participants + COALESCE(NEW.participants, 0),
+                total_waste = total_waste + COALESCE(NEW.waste_collected, 0),
+                total_area = total_area + COALESCE(NEW.area_covered, 0)
+            WHERE id = 1;
+            INSERT INTO action_type_counts (action_type, count) VALUES (NEW.action_type, 1)
+                ON CONFLICT (action_type) DO UPDATE SET count = count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_actions_stats_delete AFTER DELETE ON conservation_actions
+        BEGIN
+            UPDATE community_stats SET
+                total_actions = total_actions - 1,
+                total_participants = total_participants - COALESCE(OLD.participants, 0),
+                total_waste = total_waste - COALESCE(OLD.waste_collected, 0),
+                total_area = total_area - COALESCE(OLD.area_covered, 0)
+            WHERE id = 1;
+            UPDATE action_type_counts SET count = count - 1 WHERE action_type = OLD.action_type;
+            DELETE FROM action_type_counts WHERE action_type = OLD.action_type AND count <= 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_actions_stats_update
+        AFTER UPDATE OF action_type, participants, waste_collected, area_covered ON conservation_actions
+        BEGIN
+            UPDATE community_stats SET
+                total_participants = total_participants - COALESCE(OLD.participants, 0) + COALESCE(NEW.participants, 0),
+                total_waste = total_waste - COALESCE(OLD.waste_collected, 0) + COALESCE(NEW.waste_collected, 0),
+                total_area = total_area - COALESCE(OLD.area_covered, 0) + COALESCE(NEW.area_covered, 0)
+            WHERE id = 1;
+            UPDATE action_type_counts SET count = count - 1 WHERE action_type = OLD.action_type;
+            DELETE FROM action_type_counts WHERE action_type = OLD.action_type AND count <= 0;
+            INSERT INTO action_type_counts (action_type, count) VALUES (NEW.action_type, 1)
+                ON CONFLICT (action_type) DO UPDATE SET count = count + 1;
+        END
+        ''',
+        *COMMUNITY_STATS_REBUILD,
+    )),
+    (3, "daily/weekly rollups for sightings, beach quality and conservation trends", (
+        '''
+        CREATE TABLE IF NOT EXISTS sighting_rollups (
+            granularity TEXT NOT NULL,
+            bucket DATE NOT NULL,
+            species_type TEXT NOT NULL,
+            sightings NUMERIC NOT NULL DEFAULT 0,
+            individuals NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket, species_type)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_sighting_rollups_insert AFTER INSERT ON marine_sightings
+        BEGIN
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('day', date(NEW.date_spotted), NEW.species_type, 1, COALESCE(NEW.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('week', date(NEW.date_spotted, 'weekday 0', '-6 days'), NEW.species_type, 1, COALESCE(NEW.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_sighting_rollups_delete AFTER DELETE ON marine_sightings
+        BEGIN
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('day', date(OLD.date_spotted), OLD.species_type, -1, -COALESCE(OLD.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('week', date(OLD.date_spotted, 'weekday 0', '-6 days'), OLD.species_type, -1, -COALESCE(OLD.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+            DELETE FROM sighting_rollups WHERE species_type = OLD.species_type AND sightings <= 0
+                AND bucket IN (date(OLD.date_spotted), date(OLD.date_spotted, 'weekday 0', '-6 days'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_sighting_rollups_update AFTER UPDATE ON marine_sightings
+        BEGIN
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('day', date(OLD.date_spotted), OLD.species_type, -1, -COALESCE(OLD.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('week', date(OLD.date_spotted, 'weekday 0', '-6 days'), OLD.species_type, -1, -COALESCE(OLD.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+            DELETE FROM sighting_rollups WHERE species_type = OLD.species_type AND sightings <= 0
+                AND bucket IN (date(OLD.date_spotted), date(OLD.date_spotted, 'weekday 0', '-6 days'));
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('day', date(NEW.date_spotted), NEW.species_type, 1, COALESCE(NEW.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+            INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+                VALUES ('week', date(NEW.date_spotted, 'weekday 0', '-6 days'), NEW.species_type, 1, COALESCE(NEW.group_size, 1))
+                ON CONFLICT (granularity, bucket, species_type) DO UPDATE SET sightings = sightings + excluded.sightings, individuals = individuals + excluded.individuals;
+        END
+        ''',
+        "DELETE FROM sighting_rollups",
+        '''
+        INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+        SELECT 'day', date(s.date_spotted), s.species_type, SUM(1), SUM(COALESCE(s.group_size, 1))
+        FROM marine_sightings s GROUP BY 2, 3
+        ''',
+        '''
+        INSERT INTO sighting_rollups (granularity, bucket, species_type, sightings, individuals)
+        SELECT 'week', date(s.date_spotted, 'weekday 0', '-6 days'), s.species_type, SUM(1), SUM(COALESCE(s.group_size, 1))
+        FROM marine_sightings s GROUP BY 2, 3
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS beach_quality_rollups (
+            granularity TEXT NOT NULL,
+            bucket DATE NOT NULL,
+            beach_name TEXT NOT NULL,
+            reports NUMERIC NOT NULL DEFAULT 0,
+            quality_sum NUMERIC NOT NULL DEFAULT 0,
+            quality_count NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket, beach_name)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_beach_quality_rollups_insert AFTER INSERT ON beach_reports
+        BEGIN
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('day', date(NEW.report_date), NEW.beach_name, 1, COALESCE(ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), (ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('week', date(NEW.report_date, 'weekday 0', '-6 days'), NEW.beach_name, 1, COALESCE(ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), (ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_beach_quality_rollups_delete AFTER DELETE ON beach_reports
+        BEGIN
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('day', date(OLD.report_date), OLD.beach_name, -1, -COALESCE(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), -(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('week', date(OLD.report_date, 'weekday 0', '-6 days'), OLD.beach_name, -1, -COALESCE(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), -(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+            DELETE FROM beach_quality_rollups WHERE beach_name = OLD.beach_name AND reports <= 0
+                AND bucket IN (date(OLD.report_date), date(OLD.report_date, 'weekday 0', '-6 days'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_beach_quality_rollups_update AFTER UPDATE ON beach_reports
+        BEGIN
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('day', date(OLD.report_date), OLD.beach_name, -1, -COALESCE(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), -(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('week', date(OLD.report_date, 'weekday 0', '-6 days'), OLD.beach_name, -1, -COALESCE(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), -(ROUND(MIN(5.0, MAX(1.0, OLD.water_quality * 0.4 + OLD.pollution_level * 0.5 +
+                    CASE OLD.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+            DELETE FROM beach_quality_rollups WHERE beach_name = OLD.beach_name AND reports <= 0
+                AND bucket IN (date(OLD.report_date), date(OLD.report_date, 'weekday 0', '-6 days'));
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('day', date(NEW.report_date), NEW.beach_name, 1, COALESCE(ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), (ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+                VALUES ('week', date(NEW.report_date, 'weekday 0', '-6 days'), NEW.beach_name, 1, COALESCE(ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0), (ROUND(MIN(5.0, MAX(1.0, NEW.water_quality * 0.4 + NEW.pollution_level * 0.5 +
+                    CASE NEW.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+                ON CONFLICT (granularity, bucket, beach_name) DO UPDATE SET reports = reports + excluded.reports, quality_sum = quality_sum + excluded.quality_sum, quality_count = quality_count + excluded.quality_count;
+        END
+        ''',
+        "DELETE FROM beach_quality_rollups",
+        '''
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+            SELECT 'day', date(s.report_date), s.beach_name, SUM(1), SUM(COALESCE(ROUND(MIN(5.0, MAX(1.0, s.water_quality * 0.4 + s.pollution_level * 0.5 +
+    CASE s.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0)), SUM((ROUND(MIN(5.0, MAX(1.0, s.water_quality * 0.4 + s.pollution_level * 0.5 +
+    CASE s.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+            FROM beach_reports s GROUP BY 2, 3
+        ''',
+        '''
+            INSERT INTO beach_quality_rollups (granularity, bucket, beach_name, reports, quality_sum, quality_count)
+            SELECT 'week', date(s.report_date, 'weekday 0', '-6 days'), s.beach_name, SUM(1), SUM(COALESCE(ROUND(MIN(5.0, MAX(1.0, s.water_quality * 0.4 + s.pollution_level * 0.5 +
+    CASE s.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2), 0)), SUM((ROUND(MIN(5.0, MAX(1.0, s.water_quality * 0.4 + s.pollution_level * 0.5 +
+    CASE s.wildlife_activity WHEN 'high' THEN 0.5 WHEN 'medium' THEN 0.3 WHEN 'low' THEN 0.1 ELSE 0 END)), 2) IS NOT NULL))
+            FROM beach_reports s GROUP BY 2, 3
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS action_rollups (
+            granularity TEXT NOT NULL,
+            bucket DATE NOT NULL,
             action_type TEXT NOT NULL,
-            title TEXT NOT NULL,
+            actions NUMERIC NOT NULL DEFAULT 0,
+            participants NUMERIC NOT NULL DEFAULT 0,
+            waste_collected NUMERIC NOT NULL DEFAULT 0,
+            area_covered NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket, action_type)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_action_rollups_insert AFTER INSERT ON conservation_actions
+        BEGIN
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('day', date(NEW.date_completed), NEW.action_type, 1, COALESCE(NEW.participants, 0), COALESCE(NEW.waste_collected, 0), COALESCE(NEW.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('week', date(NEW.date_completed, 'weekday 0', '-6 days'), NEW.action_type, 1, COALESCE(NEW.participants, 0), COALESCE(NEW.waste_collected, 0), COALESCE(NEW.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_action_rollups_delete AFTER DELETE ON conservation_actions
+        BEGIN
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('day', date(OLD.date_completed), OLD.action_type, -1, -COALESCE(OLD.participants, 0), -COALESCE(OLD.waste_collected, 0), -COALESCE(OLD.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('week', date(OLD.date_completed, 'weekday 0', '-6 days'), OLD.action_type, -1, -COALESCE(OLD.participants, 0), -COALESCE(OLD.waste_collected, 0), -COALESCE(OLD.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+            DELETE FROM action_rollups WHERE action_type = OLD.action_type AND actions <= 0
+                AND bucket IN (date(OLD.date_completed), date(OLD.date_completed, 'weekday 0', '-6 days'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_action_rollups_update AFTER UPDATE ON conservation_actions
+        BEGIN
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('day', date(OLD.date_completed), OLD.action_type, -1, -COALESCE(OLD.participants, 0), -COALESCE(OLD.waste_collected, 0), -COALESCE(OLD.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('week', date(OLD.date_completed, 'weekday 0', '-6 days'), OLD.action_type, -1, -COALESCE(OLD.participants, 0), -COALESCE(OLD.waste_collected, 0), -COALESCE(OLD.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+            DELETE FROM action_rollups WHERE action_type = OLD.action_type AND actions <= 0
+                AND bucket IN (date(OLD.date_completed), date(OLD.date_completed, 'weekday 0', '-6 days'));
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('day', date(NEW.date_completed), NEW.action_type, 1, COALESCE(NEW.participants, 0), COALESCE(NEW.waste_collected, 0), COALESCE(NEW.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+            INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+                VALUES ('week', date(NEW.date_completed, 'weekday 0', '-6 days'), NEW.action_type, 1, COALESCE(NEW.participants, 0), COALESCE(NEW.waste_collected, 0), COALESCE(NEW.area_covered, 0))
+                ON CONFLICT (granularity, bucket, action_type) DO UPDATE SET actions = actions + excluded.actions, participants = participants + excluded.participants, waste_collected = waste_collected + excluded.waste_collected, area_covered = area_covered + excluded.area_covered;
+        END
+        ''',
+        "DELETE FROM action_rollups",
+        '''
+        INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+        SELECT 'day', date(s.date_completed), s.action_type, SUM(1), SUM(COALESCE(s.participants, 0)), SUM(COALESCE(s.waste_collected, 0)), SUM(COALESCE(s.area_covered, 0))
+        FROM conservation_actions s GROUP BY 2, 3
+        ''',
+        '''
+        INSERT INTO action_rollups (granularity, bucket, action_type, actions, participants, waste_collected, area_covered)
+        SELECT 'week', date(s.date_completed, 'weekday 0', '-6 days'), s.action_type, SUM(1), SUM(COALESCE(s.participants, 0)), SUM(COALESCE(s.waste_collected, 0)), SUM(COALESCE(s.area_covered, 0))
+        FROM conservation_actions s GROUP BY 2, 3
+        ''',
+    )),
+    (4, "r*tree spatial indexes for sightings, beach reports and conservation actions", (
+        *_spatial_index_schema("marine_sightings"),
+        *_spatial_index_schema("beach_reports"),
+        *_spatial_index_schema("conservation_actions"),
+    )),
+    (5, "fts5 full-text search over sightings, beach reports and conservation actions", (
+        *_search_index_schema("sightings"),
+        *_search_index_schema("beach_reports"),
+        *_search_index_schema("conservation_actions"),
+    )),
+]
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """highest applied migration version (0 for a fresh database)"""
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """apply pending migrations in order, one transaction per step
+    returns the resulting schema version"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
             description TEXT,
-            location_name TEXT,
-            latitude REAL,
-            longitude REAL,
-            participants INTEGER DEFAULT 1,
-            waste_collected REAL DEFAULT 0,
-            area_covered REAL DEFAULT 0,
-            date_completed DATE NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    conn.commit()
-    conn.close()
-    print("Database initialized")
+    current = get_schema_version(conn)
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied migration {version}: {description}")
+        current = version
+    return current
+
+
+# KEYSET PAGINATION
+# sort key of each list, newest first; id last as the unique tiebreaker
+SIGHTING_SORT = ("date_spotted", "created_at", "id")
+REPORT_SORT = ("report_date", "id")
+ACTION_SORT = ("date_completed", "id")
+
+# json type of each sort key in a cursor (anything not listed is a date / text column)
+CURSOR_TYPES = {"id": int, "rank": (int, float)}
+
+def encode_cursor(row, sort_keys: tuple) -> str:
+    """opaque cursor from the sort key + id of the last row on a page"""
+    payload = json.dumps([row[key] for key in sort_keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_keys: tuple) -> tuple:
+    """sort key values from a cursor, raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise ValueError("Invalid cursor")
+    for key, value in zip(sort_keys, values):
+        expected = CURSOR_TYPES.get(key, str)
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ValueError("Invalid cursor")
+    return tuple(values)
+
+def _page_clause(alias: str, sort_keys: tuple, limit: int, offset: int = 0, cursor: str = None,
+                 where: str = "", params: tuple = ()) -> Tuple[str, tuple]:
+    """WHERE/ORDER BY/LIMIT tail for a keyset page (cursor) or legacy offset page"""
+    conditions = [where] if where else []
+    if cursor:
+        columns = ", ".join(f"{alias}.{key}" for key in sort_keys)
+        placeholders = ", ".join("?" for _ in sort_keys)
+        conditions.append(f"({columns}) < ({placeholders})")
+        params += decode_cursor(cursor, sort_keys)
+        offset = 0
+    clause = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+    clause += "ORDER BY " + ", ".join(f"{alias}.{key} DESC" for key in sort_keys)
+    clause += " LIMIT ? OFFSET ?"
+    return clause, params + (limit, offset)
 
 
 # USER FUNCTIONS
@@ -120,6 +809,10 @@ def create_user(email: str, name: str, password: str, location: str = None) -> i
         (email, name, password, location), commit=True
     )
 
+def update_user_password(user_id: int, password: str) -> bool:
+    """replace a user's password hash"""
+    return execute_query('UPDATE users SET password = ? WHERE id = ?', (password, user_id), commit=True)
+
 def get_user_by_email(email: str) -> Optional[Tuple]:
     """get user by email"""
     return execute_query('SELECT * FROM users WHERE email = ?', (email,), fetch_one=True)
@@ -132,35 +825,37 @@ def get_user_by_id(user_id: int) -> Optional[Tuple]:
 def create_marine_sighting(user_id: int, species_name: str, species_type: str, 
                           location_name: str, latitude: float, longitude: float, 
                           date_spotted: str, time_spotted: str = None, group_size: int = 1, 
-                          behavior: str = None, notes: str = None) -> int:
-    """create marine sighting"""
+                          behavior: str = None, notes: str = None) -> Optional[Tuple]:
+    """create marine sighting, return the stored row"""
     return execute_query('''
         INSERT INTO marine_sightings 
         (user_id, species_name, species_type, location_name, latitude, longitude, 
          date_spotted, time_spotted, group_size, behavior, notes)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING *
     ''', (user_id, species_name, species_type, location_name, latitude, longitude, 
-          date_spotted, time_spotted, group_size, behavior, notes), commit=True)
+          date_spotted, time_spotted, group_size, behavior, notes), fetch_one=True, commit=True)
 
-def get_all_sightings(limit: int = 100, offset: int = 0) -> List[Tuple]:
-    """get all sightings with pagination"""
-    return execute_query('''
+def get_all_sightings(limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """get all sightings with keyset (cursor) or legacy offset pagination"""
+    page, params = _page_clause("ms", SIGHTING_SORT, limit, offset, cursor)
+    return execute_query(f'''
         SELECT ms.*, u.name as user_name 
         FROM marine_sightings ms 
         JOIN users u ON ms.user_id = u.id 
-        ORDER BY ms.date_spotted DESC, ms.created_at DESC 
-        LIMIT ? OFFSET ?
-    ''', (limit, offset))
+        {page}
+    ''', params)
 
-def get_user_sightings(user_id: int) -> List[Tuple]:
-    """get all sightings by user"""
-    return execute_query('''
+def get_user_sightings(user_id: int, limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """get sightings by user with keyset (cursor) or legacy offset pagination"""
+    page, params = _page_clause("ms", SIGHTING_SORT, limit, offset, cursor,
+                                where="ms.user_id = ?", params=(user_id,))
+    return execute_query(f'''
         SELECT ms.*, u.name as user_name 
         FROM marine_sightings ms 
         JOIN users u ON ms.user_id = u.id 
-        WHERE ms.user_id = ? 
-        ORDER BY ms.date_spotted DESC
-    ''', (user_id,))
+        {page}
+    ''', params)
 
 def get_sighting_by_id(sighting_id: int) -> Optional[Tuple]:
     """get sighting by ID"""
@@ -179,35 +874,37 @@ def delete_marine_sighting(sighting_id: int) -> bool:
 def create_beach_report(user_id: int, beach_name: str, latitude: float, longitude: float,
                        water_quality: int, pollution_level: int, report_date: str,
                        water_temp: float = None, wildlife_activity: str = None,
-                       notes: str = None) -> int:
-    """create beach report"""
+                       weather_conditions: str = None, notes: str = None) -> Optional[Tuple]:
+    """create beach report, return the stored row"""
     return execute_query('''
         INSERT INTO beach_reports 
         (user_id, beach_name, latitude, longitude, water_quality, pollution_level,
-         water_temp, wildlife_activity, notes, report_date)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+         water_temp, wildlife_activity, weather_conditions, notes, report_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING *
     ''', (user_id, beach_name, latitude, longitude, water_quality, pollution_level,
-          water_temp, wildlife_activity,notes, report_date), commit=True)
+          water_temp, wildlife_activity, weather_conditions, notes, report_date), fetch_one=True, commit=True)
 
-def get_all_beach_reports(limit: int = 100, offset: int = 0) -> List[Tuple]:
-    """get all beach reports with pagination"""
-    return execute_query('''
+def get_all_beach_reports(limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """get all beach reports with keyset (cursor) or legacy offset pagination"""
+    page, params = _page_clause("br", REPORT_SORT, limit, offset, cursor)
+    return execute_query(f'''
         SELECT br.*, u.name as user_name 
         FROM beach_reports br 
         JOIN users u ON br.user_id = u.id 
-        ORDER BY br.report_date DESC
-        LIMIT ? OFFSET ?
-    ''', (limit, offset))
+        {page}
+    ''', params)
 
-def get_user_beach_reports(user_id: int) -> List[Tuple]:
-    """get all beach reports by user"""
-    return execute_query('''
+def get_user_beach_reports(user_id: int, limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """get beach reports by user with keyset (cursor) or legacy offset pagination"""
+    page, params = _page_clause("br", REPORT_SORT, limit, offset, cursor,
+                                where="br.user_id = ?", params=(user_id,))
+    return execute_query(f'''
         SELECT br.*, u.name as user_name 
         FROM beach_reports br 
         JOIN users u ON br.user_id = u.id 
-        WHERE br.user_id = ? 
-        ORDER BY br.report_date DESC
-    ''', (user_id,))
+        {page}
+    ''', params)
 
 def get_beach_report_by_id(report_id: int) -> Optional[Tuple]:
     """get beach report by ID"""
@@ -226,35 +923,37 @@ def delete_beach_report(report_id: int) -> bool:
 def create_conservation_action(user_id: int, action_type: str, title: str, description: str,
                               location_name: str, latitude: float, longitude: float,
                               participants: int, waste_collected: float,
-                              area_covered: float, date_completed: str) -> int:
-    """create conservation action"""
+                              area_covered: float, date_completed: str) -> Optional[Tuple]:
+    """create conservation action, return the stored row"""
     return execute_query('''
         INSERT INTO conservation_actions 
         (user_id, action_type, title, description, location_name, latitude, longitude,
          participants, waste_collected, area_covered, date_completed)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING *
     ''', (user_id, action_type, title, description, location_name, latitude, longitude,
-          participants, waste_collected, area_covered, date_completed), commit=True)
+          participants, waste_collected, area_covered, date_completed), fetch_one=True, commit=True)
 
-def get_all_conservation_actions(limit: int = 100, offset: int = 0) -> List[Tuple]:
-    """get all conservation actions with pagination"""
-    return execute_query('''
+def get_all_conservation_actions(limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """get all conservation actions with keyset (cursor) or legacy offset pagination"""
+    page, params = _page_clause("ca", ACTION_SORT, limit, offset, cursor)
+    return execute_query(f'''
         SELECT ca.*, u.name as user_name 
         FROM conservation_actions ca 
         JOIN users u ON ca.user_id = u.id 
-        ORDER BY ca.date_completed DESC
-        LIMIT ? OFFSET ?
-    ''', (limit, offset))
+        {page}
+    ''', params)
 
-def get_user_conservation_actions(user_id: int) -> List[Tuple]:
-    """get all conservation actions by user"""
-    return execute_query('''
+def get_user_conservation_actions(user_id: int, limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """get conservation actions by user with keyset (cursor) or legacy offset pagination"""
+    page, params = _page_clause("ca", ACTION_SORT, limit, offset, cursor,
+                                where="ca.user_id = ?", params=(user_id,))
+    return execute_query(f'''
         SELECT ca.*, u.name as user_name 
         FROM conservation_actions ca 
         JOIN users u ON ca.user_id = u.id 
-        WHERE ca.user_id = ? 
-        ORDER BY ca.date_completed DESC
-    ''', (user_id,))
+        {page}
+    ''', params)
 
 def get_conservation_action_by_id(action_id: int) -> Optional[Tuple]:
     """get conservation action by ID"""
@@ -269,30 +968,317 @@ def delete_conservation_action(action_id: int) -> bool:
     """delete conservation action"""
     return execute_query('DELETE FROM conservation_actions WHERE id=?', (action_id,), commit=True)
 
+# GEO QUERIES
+KM_PER_DEGREE_LAT = 111.32
+
+def _bbox_conditions(alias: str, bbox: tuple) -> Tuple[List[str], list]:
+    """r*tree range lookup plus an exact check (the r*tree stores 32-bit floats)
+        *bbox: (min_lon, min_lat, max_lon, max_lat); min_lon > max_lon crosses the antimeridian
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    conditions = ["r.max_lat >= ? AND r.min_lat <= ?", f"{alias}.latitude BETWEEN ? AND ?"]
+    params = [min_lat, max_lat, min_lat, max_lat]
+    if min_lon <= max_lon:
+        conditions += ["r.max_lon >= ? AND r.min_lon <= ?", f"{alias}.longitude BETWEEN ? AND ?"]
+        params += [min_lon, max_lon, min_lon, max_lon]
+    else:
+        conditions.append(f"({alias}.longitude >= ? OR {alias}.longitude <= ?)")
+        params += [min_lon, max_lon]
+    return conditions, params
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """(min_lon, min_lat, max_lon, max_lat) enclosing a circle"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(-90.0, latitude - dlat), min(90.0, latitude + dlat)
+    cos_lat = min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+    if min_lat <= -90 or max_lat >= 90 or cos_lat <= 0:
+        return -180.0, min_lat, 180.0, max_lat  # circle covers a pole
+    dlon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if dlon >= 180:
+        return -180.0, min_lat, 180.0, max_lat
+    min_lon, max_lon = longitude - dlon, longitude + dlon
+    if min_lon < -180:
+        min_lon += 360  # wraps: min_lon > max_lon
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lon, min_lat, max_lon, max_lat
+
+def get_in_area(table: str, bbox: tuple = None, near: tuple = None, radius_km: float = None,
+                user_id: int = None, limit: int = 100, offset: int = 0, cursor: str = None) -> List[Tuple]:
+    """rows of a located table (marine_sightings / beach_reports / conservation_actions) by area
+        *bbox: (min_lon, min_lat, max_lon, max_lat) - newest first, keyset (cursor) pagination
+        *near: (latitude, longitude) within radius_km - nearest first with distance_km, offset pagination
+    """
+    alias, rtree = SPATIAL_INDEXES[table]
+    sort_keys = {"marine_sightings": SIGHTING_SORT, "beach_reports": REPORT_SORT,
+                 "conservation_actions": ACTION_SORT}[table]
+    conditions, params = _bbox_conditions(alias, radius_bbox(*near, radius_km) if near else bbox)
+    if user_id:
+        conditions.append(f"{alias}.user_id = ?")
+        params.append(user_id)
+
+    select = f'''
+        SELECT {alias}.*, u.name as user_name{{distance}}
+        FROM {rtree} r
+        JOIN {table} {alias} ON {alias}.id = r.id
+        JOIN users u ON {alias}.user_id = u.id
+    '''
+    if near:
+        distance = f"distance_km(?, ?, {alias}.latitude, {alias}.longitude)"
+        return execute_query(f'''
+            SELECT * FROM ({select.format(distance=f", {distance} AS distance_km")}
+                WHERE {" AND ".join(conditions)})
+            WHERE distance_km <= ?
+            ORDER BY distance_km, id
+            LIMIT ? OFFSET ?
+        ''', (*near, *params, radius_km, limit, offset))
+
+    page, page_params = _page_clause(alias, sort_keys, limit, offset, cursor,
+                                     where=" AND ".join(conditions), params=tuple(params))
+    return execute_query(select.format(distance="") + page, page_params)
+
+# SEARCH
+SEARCH_SORT = ("rank", "type", "id")  # best match first (bm25 rank: lower is better)
+SEARCH_HIGHLIGHT = ("[", "]")  # plain markers around matched terms in snippets
+
+def to_fts_query(text: str) -> Optional[str]:
+    """user text -> fts5 query: every word quoted (no query syntax), prefix match for words ending
+        in * and for the last word while it is still being typed
+    """
+    terms = re.findall(r"\w+\*?", text)
+    if not terms:
+        return None
+    quoted = []
+    for i, term in enumerate(terms):
+        word = term.rstrip("*")
+        prefix = term.endswith("*") or (i == len(terms) - 1 and not text[-1:].isspace())
+        quoted.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(quoted)
+
+def search(query: str, kinds: List[str] = None, limit: int = 20, cursor: str = None) -> List[Tuple]:
+    """ranked full-text matches across the indexed tables with keyset (cursor) pagination
+        *query: fts5 query (see to_fts_query)
+        *kinds: subset of SEARCH_INDEXES (default all)
+    """
+    open_mark, close_mark = SEARCH_HIGHLIGHT
+    branches, params = [], []
+    for kind in kinds or SEARCH_INDEXES:
+        table, fts, _, title, date_column = SEARCH_INDEXES[kind]
+        branches.append(f'''
+            SELECT '{kind}' AS type, t.id, t.{title} AS title, t.{date_column} AS activity_date,
+                   snippet({fts}, -1, ?, ?, '...', 12) AS snippet, {fts}.rank AS rank
+            FROM {fts} JOIN {table} t ON t.id = {fts}.rowid
+            WHERE {fts} MATCH ?
+        ''')
+        params += [open_mark, close_mark, query]
+
+    where = ""
+    if cursor:
+        where = "WHERE (rank, type, id) > (?, ?, ?)"
+        params += decode_cursor(cursor, SEARCH_SORT)
+    return execute_query(f'''
+        SELECT * FROM ({" UNION ALL ".join(branches)})
+        {where}
+        ORDER BY rank, type, id
+        LIMIT ?
+    ''', (*params, limit))
+
+# MAP TILES
+def get_tile_cells(table: str, type_column: str, bounds: tuple, columns: int, lat_edges: list) -> List[Tuple]:
+    """per grid cell and type: count, coordinate sums and extent of the rows inside a map tile
+        *bounds: tile (min_lon, min_lat, max_lon, max_lat); west/north edges inclusive, like tile numbering
+        *lat_edges: interior row edges, north to south (rows are not evenly spaced in latitude)
+    """
+    alias, rtree = SPATIAL_INDEXES[table]
+    min_lon, min_lat, max_lon, max_lat = bounds
+    width = (max_lon - min_lon) / columns
+    cell_y = " + ".join(f"({alias}.latitude < ?)" for _ in lat_edges) or "0"
+    east = "<=" if max_lon >= 180 else "<"
+    return execute_query(f'''
+        SELECT
+            MIN(?, CAST(({alias}.longitude - ?) / ? AS INTEGER)) AS cx,
+            {cell_y} AS cy,
+            {alias}.{type_column} AS type,
+            COUNT(*) AS count,
+            SUM({alias}.latitude) AS lat_sum, SUM({alias}.longitude) AS lon_sum,
+            MIN({alias}.latitude) AS min_lat, MAX({alias}.latitude) AS max_lat,
+            MIN({alias}.longitude) AS min_lon, MAX({alias}.longitude) AS max_lon
+        FROM {rtree} r
+        JOIN {table} {alias} ON {alias}.id = r.id
+        WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+            AND {alias}.latitude > ? AND {alias}.latitude <= ?
+            AND {alias}.longitude >= ? AND {alias}.longitude {east} ?
+        GROUP BY 1, 2, 3
+    ''', (columns - 1, min_lon, width, *lat_edges,
+          min_lat, max_lat, min_lon, max_lon, min_lat, max_lat, min_lon, max_lon))
+
+# BULK INSERT
+def bulk_insert(table: str, columns: tuple, rows: List[tuple]) -> Tuple[int, List[Tuple[int, str]]]:
+    """insert rows in one writer transaction with executemany
+        returns (inserted, [(row index, error)]); on a constraint error the chunk is retried
+        row by row so only the offending rows are rejected
+    """
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    with get_db() as conn:
+        try:
+            conn.executemany(query, rows)
+            conn.commit()
+            return len(rows), []
+        except sqlite3.IntegrityError:
+            conn.rollback()
+
+        inserted, failures = 0, []
+        try:
+            for index, row in enumerate(rows):
+                try:
+                    conn.execute(query, row)
+                    inserted += 1
+                except sqlite3.IntegrityError as e:
+                    failures.append((index, str(e)))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return inserted, failures
+
+# EXPORT
+EXPORT_CHUNK_SIZE = 1000  # rows read per query
+
+# resource -> (table, alias, date column, filterable columns, extra select)
+EXPORTS = {
+    "sightings": ("marine_sightings", "ms", "date_spotted", ("species_type", "species_name"), ""),
+    "beach_reports": ("beach_reports", "br", "report_date", ("beach_name",),
+                      ", " + BEACH_QUALITY_SQL.format("br") + " AS quality_score"),
+    "conservation_actions": ("conservation_actions", "ca", "date_completed", ("action_type",), ""),
+}
+
+def iter_export(resource: str, start: str = None, end: str = None, user_id: int = None,
+                filters: dict = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[sqlite3.Row]]:
+    """all matching rows in id order, yielded chunk by chunk (keyset on id)
+        *filters: exact matches on EXPORTS filterable columns
+    """
+    table, alias, date_column, filterable, extra = EXPORTS[resource]
+    conditions, params = [], []
+    if start:
+        conditions.append(f"{alias}.{date_column} >= ?")
+        params.append(start)
+    if end:
+        conditions.append(f"{alias}.{date_column} <= ?")
+        params.append(end)
+    if user_id:
+        conditions.append(f"{alias}.user_id = ?")
+        params.append(user_id)
+    for column, value in (filters or {}).items():
+        if column not in filterable:
+            raise ValueError(f"Cannot filter {resource} by {column}")
+        conditions.append(f"{alias}.{column} = ?")
+        params.append(value)
+    conditions.append(f"{alias}.id > ?")
+    query = f'''
+        SELECT {alias}.*, u.name as user_name{extra}
+        FROM {table} {alias}
+        JOIN users u ON {alias}.user_id = u.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {alias}.id
+        LIMIT ?
+    '''
+
+    last_id = 0
+    while True:
+        # a pooled connection per chunk: the pool and the WAL snapshot are released
+        # while the client consumes the chunk, so slow downloads can't starve other reads
+        with get_db(readonly=True) as conn:
+            rows = conn.execute(query, (*params, last_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        yield rows
+        if len(rows) < chunk_size:
+            break
+        last_id = rows[-1]["id"]
+
+# ACTIVITY HOTSPOTS
+def get_recent_locations(since_date: str, limit: int = 50) -> List[Tuple]:
+    """coordinates with the most beach reports + sightings since a date (~1km cells)"""
+    return execute_query('''
+        SELECT ROUND(latitude, 2) as latitude, ROUND(longitude, 2) as longitude,
+               COUNT(*) as activity
+        FROM (
+            SELECT latitude, longitude FROM beach_reports
+            WHERE report_date >= ? AND latitude IS NOT NULL AND longitude IS NOT NULL
+            UNION ALL
+            SELECT latitude, longitude FROM marine_sightings
+            WHERE date_spotted >= ? AND latitude IS NOT NULL AND longitude IS NOT NULL
+        )
+        GROUP BY 1, 2
+        ORDER BY activity DESC
+        LIMIT ?
+    ''', (since_date, since_date, limit))
+
+# DASHBOARD
+def get_activity_counts(user_id: int = None) -> dict:
+    """sightings / beach reports / conservation actions, community-wide or for one user
+    community-wide totals come from the trigger-maintained counters and daily rollups"""
+    if user_id:
+        row = execute_query('''
+            SELECT
+                (SELECT COUNT(*) FROM marine_sightings WHERE user_id = ?) AS sightings,
+                (SELECT COUNT(*) FROM beach_reports WHERE user_id = ?) AS reports,
+                (SELECT COUNT(*) FROM conservation_actions WHERE user_id = ?) AS actions
+        ''', (user_id,) * 3, fetch_one=True)
+    else:
+        row = execute_query('''
+            SELECT
+                (SELECT COALESCE(SUM(sightings), 0) FROM sighting_rollups WHERE granularity = 'day') AS sightings,
+                (SELECT COALESCE(SUM(reports), 0) FROM beach_quality_rollups WHERE granularity = 'day') AS reports,
+                (SELECT COALESCE(total_actions, 0) FROM community_stats WHERE id = 1) AS actions
+        ''', fetch_one=True)
+    counts = dict(row) if row else {}
+    return {name: int(counts.get(name) or 0) for name in ("sightings", "reports", "actions")}
+
 # STATS CALC
 def get_community_stats() -> dict:
-    """Get overall community statistics"""
-    conn = get_db()
-    cursor = conn.cursor()
+    """Get overall community statistics (O(1): read from trigger-maintained counters)"""
+    with get_db(readonly=True) as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('''
-        SELECT 
-            COUNT(*) as total_actions,
-            SUM(participants) as total_participants,
-            SUM(waste_collected) as total_waste,
-            SUM(area_covered) as total_area
-        FROM conservation_actions
-    ''')
-    stats = cursor.fetchone()
+        cursor.execute('''
+            SELECT total_actions, total_participants, total_waste, total_area
+            FROM community_stats WHERE id = 1
+        ''')
+        stats = cursor.fetchone() or (0, 0, 0, 0)
     
-    cursor.execute('''
-        SELECT action_type, COUNT(*) as count
-        FROM conservation_actions
-        GROUP BY action_type
-    ''')
-    by_type = cursor.fetchall()
+        cursor.execute('SELECT action_type, count FROM action_type_counts WHERE count > 0')
+        by_type = cursor.fetchall()
+    
+    return {
+        "total_actions": stats[0] or 0,
+        "total_participants": stats[1] or 0,
+        "total_waste_kg": stats[2] or 0,
+        "total_area_sqm": stats[3] or 0,
+        "actions_by_type": {row[0]: row[1] for row in by_type}
+    }
+
+def compute_community_stats() -> dict:
+    """community statistics by full aggregation over conservation_actions"""
+    with get_db(readonly=True) as conn:
+        cursor = conn.cursor()
     
-    conn.close()
+        cursor.execute('''
+            SELECT 
+                COUNT(*) as total_actions,
+                SUM(participants) as total_participants,
+                SUM(waste_collected) as total_waste,
+                SUM(area_covered) as total_area
+            FROM conservation_actions
+        ''')
+        stats = cursor.fetchone()
+    
+        cursor.execute('''
+            SELECT action_type, COUNT(*) as count
+            FROM conservation_actions
+            GROUP BY action_type
+        ''')
+        by_type = cursor.fetchall()
     
     return {
         "total_actions": stats[0] or 0,
@@ -302,5 +1288,115 @@ def get_community_stats() -> dict:
         "actions_by_type": {row[0]: row[1] for row in by_type}
     }
 
+def verify_community_stats(tolerance: float = 1e-6) -> dict:
+    """compare the counters with a full aggregation, report any drift"""
+    counters, actual = get_community_stats(), compute_community_stats()
+    drift = {
+        key: {"counter": counters[key], "actual": actual[key]}
+        for key in actual
+        if (counters[key] != actual[key] if key == "actions_by_type"
+            else abs(counters[key] - actual[key]) > tolerance)
+    }
+    return {"ok": not drift, "drift": drift}
+
+def rebuild_community_stats():
+    """recompute the counters from conservation_actions"""
+    with get_db() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for statement in COMMUNITY_STATS_REBUILD:
+                conn.execute(statement)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+# TIME SERIES
+# granularity -> (stored rollup read, bucket expression, range start aligned to a bucket)
+TIMESERIES_GRANULARITIES = {
+    "day": ("day", "bucket", "date(?)"),
+    "week": ("week", "bucket", "date(?, 'weekday 0', '-6 days')"),
+    "month": ("day", "strftime('%Y-%m-01', bucket)", "strftime('%Y-%m-01', ?)"),
+}
+
+def get_timeseries(metric: str, granularity: str = "week", start: str = None, end: str = None,
+                   key: str = None) -> List[dict]:
+    """trend buckets from the rollup tables, oldest first
+        *metric: sightings | beach_quality | conservation
+        *key: only this species_type / beach_name / action_type
+    """
+    if metric not in ROLLUPS or granularity not in TIMESERIES_GRANULARITIES:
+        raise ValueError("Unknown metric or granularity")
+    table, _, _, dim, measures = ROLLUPS[metric]
+    stored, bucket, aligned_start = TIMESERIES_GRANULARITIES[granularity]
+
+    where, params = ["granularity = ?"], [stored]
+    if start:
+        where.append(f"bucket >= {aligned_start}")
+        params.append(start)
+    if end:
+        where.append("bucket <= ?")
+        params.append(end)
+    if key:
+        where.append(f"{dim} = ?")
+        params.append(key)
+    sums = ", ".join(f"SUM({m}) AS {m}" for m in measures)
+
+    rows = execute_query(f'''
+        SELECT {bucket} AS bucket, {dim} AS key, {sums}
+        FROM {table}
+        WHERE {" AND ".join(where)}
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    ''', tuple(params))
+
+    series = []
+    for row in rows:
+        point = dict(row)
+        if metric == "beach_quality":
+            point["avg_quality"] = round(point["quality_sum"] / point["quality_count"], 2) if point["quality_count"] else None
+            del point["quality_sum"], point["quality_count"]
+        series.append(point)
+    return series
+
+def rebuild_rollups():
+    """recompute every rollup table from its source rows"""
+    with get_db() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for rollup in ROLLUPS.values():
+                for statement in _rollup_rebuild(rollup):
+                    conn.execute(statement)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="WaveMinder database tools")
+    parser.add_argument("command", nargs="?", default="init",
+                        choices=["init", "verify-stats", "rebuild-stats", "rebuild-rollups", "import"])
+    parser.add_argument("--resource", choices=["sightings", "beach_reports", "conservation_actions"],
+                        help="import: what the file holds")
+    parser.add_argument("--file", help="import: .csv or .ndjson file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="import: override the file extension")
+    parser.add_argument("--user-id", type=int, help="import: owner of the imported rows")
+    parser.add_argument("--chunk-size", type=int, default=500, help="import: rows per transaction")
+    args = parser.parse_args()
+    if args.command == "import" and not (args.resource and args.file and args.user_id):
+        parser.error("import needs --resource, --file and --user-id")
+
+    init_database()
+    if args.command == "verify-stats":
+        print(verify_community_stats())
+    elif args.command == "rebuild-stats":
+        rebuild_community_stats()
+        print(verify_community_stats())
+    elif args.command == "rebuild-rollups":
+        rebuild_rollups()
+        print("Rollups rebuilt")
+    elif args.command == "import":
+        import ingest
+        report = ingest.import_file(args.resource, args.file, args.user_id, args.format, args.chunk_size)
+        print(json.dumps(report, indent=2))
\ No newline at end of file
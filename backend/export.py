@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List
+import database
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def ndjson_chunks(chunks: Iterable[List]) -> Iterator[bytes]:
+    """one json object per row"""
+    for rows in chunks:
+        yield "".join(json.dumps(dict(row), default=str) + "\n" for row in rows).encode()
+
+def csv_chunks(chunks: Iterable[List]) -> Iterator[bytes]:
+    """header from the first row's columns, then one line per row"""
+    header_written = False
+    for rows in chunks:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow(rows[0].keys())
+            header_written = True
+        writer.writerows(tuple(row) for row in rows)
+        yield buffer.getvalue().encode()
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """gzip a byte stream incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_export(resource: str, fmt: str, compress: bool = False, **query) -> Iterator[bytes]:
+    """encoded export of database.iter_export; rows are read as the client consumes the stream"""
+    encode = csv_chunks if fmt == "csv" else ndjson_chunks
+    body = encode(database.iter_export(resource, **query))
+    return gzip_chunks(body) if compress else body
@@ -0,0 +1,173 @@
+import asyncio
+import codecs
+import csv
+import json
+import queue
+from typing import Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+import database
+import schemas
+
+# INGEST CONFIGS
+BULK_CHUNK_SIZE = 500  # rows per insert transaction (the write lock is released between chunks)
+MAX_REPORTED_ERRORS = 100  # per-row errors listed in a report (all are counted)
+STREAM_QUEUE_CHUNKS = 8  # request body chunks buffered ahead of the importer thread
+FORMATS = ("ndjson", "csv")
+
+VALID_ACTION_TYPES = ["beach_cleanup", "citizen_science", "education", "restoration", "monitoring", "policy_advocacy"]
+
+
+# VALIDATION (shared with the single-row endpoints)
+def beach_report_error(report: schemas.BeachReportCreate) -> Optional[str]:
+    """range checks beyond the schema, None if the report is valid"""
+    if not (1 <= report.water_quality <= 5):
+        return "Water quality must be 1-5"
+    if not (1 <= report.pollution_level <= 5):
+        return "Pollution level must be 1-5"
+    if report.wildlife_activity and report.wildlife_activity.lower() not in ["high", "medium", "low", "none"]:
+        return "Wildlife activity must be high, medium, low, or none"
+    return None
+
+def conservation_action_error(action: schemas.ConservationActionCreate) -> Optional[str]:
+    """range checks beyond the schema, None if the action is valid"""
+    if action.action_type not in VALID_ACTION_TYPES:
+        return f"Action type must be one of: {', '.join(VALID_ACTION_TYPES)}"
+    if action.participants < 1 or action.participants > 10000:
+        return "Participants must be between 1 and 10,000"
+    if action.waste_collected < 0 or action.waste_collected > 10000:
+        return "Waste collected must be between 0 and 10,000 kg"
+    if action.area_covered < 0 or action.area_covered > 1000000:
+        return "Area covered must be between 0 and 1,000,000 sqm"
+    return None
+
+# resource -> (table, schema, extra check)
+RESOURCES = {
+    "sightings": ("marine_sightings", schemas.MarineSightingCreate, None),
+    "beach_reports": ("beach_reports", schemas.BeachReportCreate, beach_report_error),
+    "conservation_actions": ("conservation_actions", schemas.ConservationActionCreate, conservation_action_error),
+}
+
+
+# PARSING
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """utf-8 byte chunks -> text lines (newline kept, so csv can span quoted newlines)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(line number, record, parse error) for each ndjson line / csv row"""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, "More values than header columns"
+                continue
+            # blank cells fall back to the schema defaults
+            yield reader.line_num, {k: v for k, v in row.items() if v not in ("", None)}, None
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, record, None
+
+def validate(resource: str, record: dict) -> Tuple[Optional[dict], Optional[List[str]]]:
+    """schema + range checks -> (column values, None) or (None, errors)"""
+    _, schema, check = RESOURCES[resource]
+    try:
+        item = schema(**record)
+    except ValidationError as e:
+        return None, [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()]
+    error = check(item) if check else None
+    if error:
+        return None, [error]
+    return item.dict(), None
+
+
+# IMPORT
+def import_records(resource: str, records: Iterable[Tuple[int, Optional[dict], Optional[str]]], user_id: int,
+                   chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """validate and insert records chunk by chunk for one user, report counts and per-row errors"""
+    table = RESOURCES[resource][0]
+    report = {"received": 0, "inserted": 0, "failed": 0, "errors": []}
+
+    def fail(line: int, errors: List[str]):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line, "errors": errors})
+
+    def flush(chunk: list):
+        columns = ("user_id", *chunk[0][1])
+        inserted, failures = database.bulk_insert(table, columns, [(user_id, *values.values()) for _, values in chunk])
+        report["inserted"] += inserted
+        for index, error in failures:
+            fail(chunk[index][0], [error])
+
+    chunk = []
+    for line, record, parse_error in records:
+        report["received"] += 1
+        if parse_error:
+            fail(line, [parse_error])
+            continue
+        values, errors = validate(resource, record)
+        if errors:
+            fail(line, errors)
+            continue
+        chunk.append((line, values))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return report
+
+def import_stream(resource: str, chunks: Iterable[bytes], fmt: str, user_id: int,
+                  chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """import ndjson / csv bytes without holding the whole input in memory"""
+    return import_records(resource, iter_records(iter_lines(chunks), fmt), user_id, chunk_size)
+
+def import_file(resource: str, path: str, user_id: int, fmt: str = None, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """import a local .csv / .ndjson file (format from the extension unless given)"""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, "rb") as f:
+        return import_stream(resource, iter(lambda: f.read(65536), b""), fmt, user_id, chunk_size)
+
+async def import_request(resource: str, body, fmt: str, user_id: int) -> dict:
+    """import an async request body stream on a worker thread, reading only as fast as rows are inserted"""
+    chunks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+    worker = asyncio.ensure_future(asyncio.to_thread(import_stream, resource, iter(chunks.get, None), fmt, user_id))
+
+    async def put(item: Optional[bytes]):
+        # wait for room without blocking the event loop; stop feeding if the importer died
+        while not worker.done():
+            try:
+                chunks.put_nowait(item)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.01)
+
+    try:
+        async for chunk in body:
+            if worker.done():
+                break
+            if chunk:
+                await put(chunk)
+    finally:
+        await put(None)
+    return await worker
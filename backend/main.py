@@ -1,35 +1,67 @@
+import asyncio
+from datetime import date
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, Depends, Form
+from fastapi import FastAPI, HTTPException, Depends, Form, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 import database
 import auth
 import schemas
 import ocean_data
+import prefetch
+import tiles
+import ingest
+import export
+from cache import TTLCache
 
 # FASTAPI
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     database.init_database()
+    prefetch.scheduler.start()
     yield
+    await prefetch.scheduler.stop()
+    await ocean_data.close_client()
+    ocean_data.disk_cache.close()
+    auth.shutdown_hash_executor()
+    auth.clear_auth_caches()
+    database.close_pool()
 
 app = FastAPI(title="WaveMinder", version="1.0", lifespan=lifespan)
 
+MAX_BATCH_LOCATIONS = 200
+MAX_RADIUS_KM = 500  # largest radius for near= list queries
+MAX_SEARCH_LIMIT = 100
+DASHBOARD_TTL = 30  # seconds a dashboard summary is reused (writes invalidate it sooner)
+DASHBOARD_RECENT = 5  # recent items of each type on the dashboard
+
+dashboard_cache = TTLCache(max_size=1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 def calculate_beach_quality(water_quality: int, pollution_level: int, wildlife_activity: str = None) -> float:
-    """calculate beach quality score(1-5)"""
+    """calculate beach quality score(1-5) - keep database.BEACH_QUALITY_SQL in step"""
     base = (water_quality * 0.4) + (pollution_level * 0.5)
     wildlife_bonus = {"high": 0.5, "medium": 0.3, "low": 0.1, "none": 0}.get(wildlife_activity or "none", 0)
     return round(min(5.0, max(1.0, base + wildlife_bonus)), 2)
 
 # HELPER FUNCTIONS - Convert DB tuples to response models
+def with_user_name(row, user) -> dict:
+    """row returned by an insert + its author's name (no join needed, the handler has the user)"""
+    return {**dict(row), "user_name": user[2]}
+
+def row_distance(row) -> Optional[float]:
+    """distance_km column of a radius query row, None otherwise"""
+    return round(row['distance_km'], 3) if 'distance_km' in row.keys() else None
+
 def sighting_to_response(s):
     """convert sighting tuple to response model"""
     return schemas.MarineSightingResponse(
@@ -45,7 +77,8 @@ def sighting_to_response(s):
         behavior=s['behavior'],
         notes=s['notes'],
         created_at=str(s['created_at']),
-        user_name=s['user_name']
+        user_name=s['user_name'],
+        distance_km=row_distance(s)
     )
 
 def beach_report_to_response(r):
@@ -60,11 +93,13 @@ def beach_report_to_response(r):
         pollution_level=r['pollution_level'],
         water_temp=r['water_temp'],
         wildlife_activity=r['wildlife_activity'],
+        weather_conditions=r['weather_conditions'],
         notes=r['notes'],
         report_date=r['report_date'],
         created_at=str(r['created_at']),
         user_name=r['user_name'],
-        quality_score=quality_score
+        quality_score=quality_score,
+        distance_km=row_distance(r)
     )
 
 def conservation_to_response(a):
@@ -82,23 +117,104 @@ def conservation_to_response(a):
         area_covered=a['area_covered'],
         date_completed=a['date_completed'],
         created_at=str(a['created_at']),
-        user_name=a['user_name']
+        user_name=a['user_name'],
+        distance_km=row_distance(a)
     )
 
+def list_page(fetch, user_id: Optional[int], limit: int, offset: int, cursor: Optional[str]):
+    """run a list query for all rows or one user's rows, 400 on a bad cursor"""
+    try:
+        if user_id:
+            return fetch(user_id, limit=limit, offset=offset, cursor=cursor)
+        return fetch(limit=limit, offset=offset, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_area(bbox: Optional[str], near: Optional[str], radius_km: float):
+    """validate bbox=min_lon,min_lat,max_lon,max_lat / near=lat,lon query params, 400 if malformed"""
+    if bbox and near:
+        raise HTTPException(status_code=400, detail="Use either bbox or near, not both")
+    if bbox:
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+            raise HTTPException(status_code=400, detail="Invalid bbox")
+        return {"bbox": (min_lon, min_lat, max_lon, max_lat)}
+    if near:
+        try:
+            latitude, longitude = (float(v) for v in near.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="near must be latitude,longitude")
+        if not ocean_data.validate_coordinates(latitude, longitude):
+            raise HTTPException(status_code=400, detail="Invalid coordinates")
+        if not (0 < radius_km <= MAX_RADIUS_KM):
+            raise HTTPException(status_code=400, detail=f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+        return {"near": (latitude, longitude), "radius_km": radius_km}
+    return None
+
+def area_page(table: str, area: dict, user_id: Optional[int], limit: int, offset: int, cursor: Optional[str]):
+    """run a bbox / radius list query, 400 on a bad cursor"""
+    if "near" in area and cursor:
+        raise HTTPException(status_code=400, detail="near results are paged with offset, not cursor")
+    try:
+        return database.get_in_area(table, user_id=user_id, limit=limit, offset=offset, cursor=cursor, **area)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_next_cursor(response: Response, rows, limit: int, sort_keys: tuple):
+    """expose the keyset cursor for the next page in the X-Next-Cursor header"""
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = database.encode_cursor(rows[-1], sort_keys)
+
+async def bulk_import(resource: str, request: Request, format: Optional[str], user_id: int) -> dict:
+    """stream a csv / ndjson request body into the bulk importer"""
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("csv" if "csv" in content_type else "ndjson")
+    if fmt not in ingest.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(ingest.FORMATS)}")
+
+    report = await ingest.import_request(resource, request.stream(), fmt, user_id)
+    if report["inserted"]:
+        invalidate_dashboard(user_id)
+        tiles.invalidate_all()
+    return report
+
+def invalidate_dashboard(user_id: int):
+    """drop the shared dashboard summary and the writing user's counts (other users' stay cached)"""
+    dashboard_cache.delete("summary")
+    dashboard_cache.delete(("user", user_id))
+
+def invalidate_after_write(user_id: int, layer: str, row, delta: int):
+    """drop cached dashboard entries and apply a created (delta 1) / deleted (delta -1) row to cached map tiles"""
+    invalidate_dashboard(user_id)
+    tiles.update_point(layer, row, delta)
+
+def cached(key, fetch):
+    """dashboard_cache lookup, filled by fetch() on a miss"""
+    value, _ = dashboard_cache.get(key)
+    if value is None:
+        value = fetch()
+        dashboard_cache.set(key, value, DASHBOARD_TTL)
+    return value
+
 # AUTH ENDPOINTS
 @app.get("/")
 def root():
     return {"message": "WaveMinder"}
 
 @app.post("/signup", response_model=schemas.UserResponse)
-def signup(request: schemas.UserCreate):
-    if database.get_user_by_email(request.email):
+async def signup(request: schemas.UserCreate):
+    if await asyncio.to_thread(database.get_user_by_email, request.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user_id = database.create_user(
+    password = await auth.hash_password(request.password)
+    user_id = await asyncio.to_thread(
+        database.create_user,
         email=request.email,
         name=request.name,
-        password=auth.get_password_hash(request.password),
+        password=password,
         location=request.location
     )
     if not user_id:
@@ -110,8 +226,8 @@ def signup(request: schemas.UserCreate):
     )
 
 @app.post("/login", response_model=schemas.Token)
-def login(email: str = Form(...), password: str = Form(...)):
-    user = auth.authenticate_user(email, password)
+async def login(email: str = Form(...), password: str = Form(...)):
+    user = await auth.authenticate_user(email, password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     return schemas.Token(
@@ -126,20 +242,38 @@ def get_current_user_info(current_user=Depends(auth.get_current_user)):
         location=current_user[4], created_at=str(current_user[5])
     )
 
+@app.get("/auth/hashing")
+def get_password_hashing_status():
+    return auth.hash_stats()
+
 # MARINE SIGHTINGS ENDPOINTS
 @app.post("/sightings", response_model=schemas.MarineSightingResponse)
 def create_sighting(sighting: schemas.MarineSightingCreate, current_user=Depends(auth.get_current_user)):
-    sighting_id = database.create_marine_sighting(user_id=current_user[0], **sighting.dict())
-    if not sighting_id:
+    new_sighting = database.create_marine_sighting(user_id=current_user[0], **sighting.dict())
+    if not new_sighting:
         raise HTTPException(status_code=500, detail="Failed to create sighting")
+    invalidate_after_write(current_user[0], "sightings", new_sighting, 1)
     
-    new_sighting = database.get_sighting_by_id(sighting_id)
-    return sighting_to_response(new_sighting)
+    return sighting_to_response(with_user_name(new_sighting, current_user))
+
+@app.post("/sightings/bulk", response_model=schemas.BulkImportReport)
+async def bulk_create_sightings(request: Request, format: Optional[str] = None, current_user=Depends(auth.get_current_user)):
+    """import many rows from an ndjson or csv body (format param or Content-Type)"""
+    return await bulk_import("sightings", request, format, current_user[0])
 
 @app.get("/sightings", response_model=List[schemas.MarineSightingResponse])
-def get_sightings(limit: int = 50, offset: int = 0, user_id: Optional[int] = None):
-    """get all sightings"""
-    sightings = database.get_user_sightings(user_id) if user_id else database.get_all_sightings(limit, offset)
+def get_sightings(response: Response, limit: int = 50, offset: int = 0, user_id: Optional[int] = None,
+                  cursor: Optional[str] = None, bbox: Optional[str] = None, near: Optional[str] = None,
+                  radius_km: float = 10):
+    """get all sightings, optionally within a bbox or radius"""
+    area = parse_area(bbox, near, radius_km)
+    if area:
+        sightings = area_page("marine_sightings", area, user_id, limit, offset, cursor)
+    else:
+        fetch = database.get_user_sightings if user_id else database.get_all_sightings
+        sightings = list_page(fetch, user_id, limit, offset, cursor)
+    if not area or "bbox" in area:
+        set_next_cursor(response, sightings, limit, database.SIGHTING_SORT)
     return [sighting_to_response(s) for s in sightings]
 
 @app.get("/sightings/{sighting_id}", response_model=schemas.MarineSightingResponse)
@@ -159,29 +293,41 @@ def delete_sighting(sighting_id: int, current_user=Depends(auth.get_current_user
         raise HTTPException(status_code=403, detail="Not authorized")
     
     database.delete_marine_sighting(sighting_id)
+    invalidate_after_write(current_user[0], "sightings", existing, -1)
     return {"message": "Sighting deleted"}
 
 # BEACH REPORTS ENDPOINTS
 @app.post("/beach-reports", response_model=schemas.BeachReportResponse)
 def create_beach_report(report: schemas.BeachReportCreate, current_user=Depends(auth.get_current_user)):
      # validate inputs
-    if not (1 <= report.water_quality <= 5):
-        raise HTTPException(status_code=400, detail="Water quality must be 1-5")
-    if not (1 <= report.pollution_level <= 5):
-        raise HTTPException(status_code=400, detail="Pollution level must be 1-5")
-    if report.wildlife_activity and report.wildlife_activity.lower() not in ["high", "medium", "low", "none"]:
-        raise HTTPException(status_code=400, detail="Wildlife activity must be high, medium, low, or none")
+    error = ingest.beach_report_error(report)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     
-    report_id = database.create_beach_report(user_id=current_user[0], **report.dict())
-    if not report_id:
+    new_report = database.create_beach_report(user_id=current_user[0], **report.dict())
+    if not new_report:
         raise HTTPException(status_code=500, detail="Failed to create report")
+    invalidate_after_write(current_user[0], "beach_reports", new_report, 1)
     
-    new_report = database.get_beach_report_by_id(report_id)
-    return beach_report_to_response(new_report)
+    return beach_report_to_response(with_user_name(new_report, current_user))
+
+@app.post("/beach-reports/bulk", response_model=schemas.BulkImportReport)
+async def bulk_create_beach_reports(request: Request, format: Optional[str] = None, current_user=Depends(auth.get_current_user)):
+    """import many rows from an ndjson or csv body (format param or Content-Type)"""
+    return await bulk_import("beach_reports", request, format, current_user[0])
 
 @app.get("/beach-reports", response_model=List[schemas.BeachReportResponse])
-def get_beach_reports(limit: int = 50, offset: int = 0, user_id: Optional[int] = None):
-    reports = database.get_user_beach_reports(user_id) if user_id else database.get_all_beach_reports(limit, offset)
+def get_beach_reports(response: Response, limit: int = 50, offset: int = 0, user_id: Optional[int] = None,
+                      cursor: Optional[str] = None, bbox: Optional[str] = None, near: Optional[str] = None,
+                      radius_km: float = 10):
+    area = parse_area(bbox, near, radius_km)
+    if area:
+        reports = area_page("beach_reports", area, user_id, limit, offset, cursor)
+    else:
+        fetch = database.get_user_beach_reports if user_id else database.get_all_beach_reports
+        reports = list_page(fetch, user_id, limit, offset, cursor)
+    if not area or "bbox" in area:
+        set_next_cursor(response, reports, limit, database.REPORT_SORT)
     return [beach_report_to_response(r) for r in reports]
 
 @app.get("/beach-reports/{report_id}", response_model=schemas.BeachReportResponse)
@@ -200,31 +346,40 @@ def delete_beach_report(report_id: int, current_user=Depends(auth.get_current_us
         raise HTTPException(status_code=403, detail="Not authorized")
     
     database.delete_beach_report(report_id)
+    invalidate_after_write(current_user[0], "beach_reports", existing, -1)
     return {"message": "Report deleted"}
 
 # CONSERVATION ACTIONS ENDPOINTS
 @app.post("/conservation-actions", response_model=schemas.ConservationActionResponse)
 def create_conservation_action(action: schemas.ConservationActionCreate, current_user=Depends(auth.get_current_user)):
     # validate inputs
-    valid_types = ["beach_cleanup", "citizen_science", "education", "restoration", "monitoring", "policy_advocacy"]
-    if action.action_type not in valid_types:
-        raise HTTPException(status_code=400, detail=f"Action type must be one of: {', '.join(valid_types)}")
-    if action.participants < 1 or action.participants > 10000:
-        raise HTTPException(status_code=400, detail="Participants must be between 1 and 10,000")
-    if action.waste_collected < 0 or action.waste_collected > 10000:
-        raise HTTPException(status_code=400, detail="Waste collected must be between 0 and 10,000 kg")
-    if action.area_covered < 0 or action.area_covered > 1000000:
-        raise HTTPException(status_code=400, detail="Area covered must be between 0 and 1,000,000 sqm") 
+    error = ingest.conservation_action_error(action)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
         
-    action_id = database.create_conservation_action(user_id=current_user[0], **action.dict())
-    if not action_id:
+    new_action = database.create_conservation_action(user_id=current_user[0], **action.dict())
+    if not new_action:
         raise HTTPException(status_code=500, detail="Failed to create action")
-    new_action = database.get_conservation_action_by_id(action_id)
-    return conservation_to_response(new_action)
+    invalidate_after_write(current_user[0], "conservation_actions", new_action, 1)
+    return conservation_to_response(with_user_name(new_action, current_user))
+
+@app.post("/conservation-actions/bulk", response_model=schemas.BulkImportReport)
+async def bulk_create_conservation_actions(request: Request, format: Optional[str] = None, current_user=Depends(auth.get_current_user)):
+    """import many rows from an ndjson or csv body (format param or Content-Type)"""
+    return await bulk_import("conservation_actions", request, format, current_user[0])
 
 @app.get("/conservation-actions", response_model=List[schemas.ConservationActionResponse])
-def get_conservation_actions(limit: int = 50, offset: int = 0, user_id: Optional[int] = None):
-    actions = database.get_user_conservation_actions(user_id) if user_id else database.get_all_conservation_actions(limit, offset)
+def get_conservation_actions(response: Response, limit: int = 50, offset: int = 0, user_id: Optional[int] = None,
+                             cursor: Optional[str] = None, bbox: Optional[str] = None, near: Optional[str] = None,
+                             radius_km: float = 10):
+    area = parse_area(bbox, near, radius_km)
+    if area:
+        actions = area_page("conservation_actions", area, user_id, limit, offset, cursor)
+    else:
+        fetch = database.get_user_conservation_actions if user_id else database.get_all_conservation_actions
+        actions = list_page(fetch, user_id, limit, offset, cursor)
+    if not area or "bbox" in area:
+        set_next_cursor(response, actions, limit, database.ACTION_SORT)
     return [conservation_to_response(a) for a in actions]
    
 @app.get("/conservation-actions/{action_id}", response_model=schemas.ConservationActionResponse)
@@ -243,58 +398,207 @@ def delete_conservation_action(action_id: int, current_user=Depends(auth.get_cur
         raise HTTPException(status_code=403, detail="Not authorized")
     
     database.delete_conservation_action(action_id)
+    invalidate_after_write(current_user[0], "conservation_actions", existing, -1)
     return {"message": "Action deleted"}
 
+# DASHBOARD
+@app.get("/dashboard", response_model=schemas.DashboardResponse)
+def get_dashboard(current_user=Depends(auth.get_current_user)):
+    """counts, recent items and community stats in one response"""
+    def summary():
+        return {
+            "community": database.get_community_stats(),
+            "totals": database.get_activity_counts(),
+            "recent_sightings": [sighting_to_response(s) for s in database.get_all_sightings(limit=DASHBOARD_RECENT)],
+            "recent_reports": [beach_report_to_response(r) for r in database.get_all_beach_reports(limit=DASHBOARD_RECENT)],
+            "recent_actions": [conservation_to_response(a) for a in database.get_all_conservation_actions(limit=DASHBOARD_RECENT)]
+        }
+
+    user_id = current_user[0]
+    return schemas.DashboardResponse(
+        **cached("summary", summary),
+        user=cached(("user", user_id), lambda: database.get_activity_counts(user_id))
+    )
+
+# EXPORT
+@app.get("/export/{resource}")
+def export_records(resource: str, format: str = "ndjson", start: Optional[date] = None, end: Optional[date] = None,
+                   user_id: Optional[int] = None, species_type: Optional[str] = None,
+                   species_name: Optional[str] = None, beach_name: Optional[str] = None,
+                   action_type: Optional[str] = None, gzip: bool = False):
+    """stream every matching row as ndjson or csv (optionally gzipped), oldest id first"""
+    if resource not in database.EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Export must be one of: {', '.join(database.EXPORTS)}")
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(export.FORMATS)}")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    filters = {column: value for column, value in {
+        "species_type": species_type, "species_name": species_name,
+        "beach_name": beach_name, "action_type": action_type
+    }.items() if value is not None}
+    filterable = database.EXPORTS[resource][3]
+    unsupported = [column for column in filters if column not in filterable]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"{resource} can be filtered by: {', '.join(filterable)}")
+
+    body = export.stream_export(
+        resource, format, compress=gzip,
+        start=start.isoformat() if start else None,
+        end=end.isoformat() if end else None,
+        user_id=user_id, filters=filters
+    )
+    filename = f"{resource}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if gzip else export.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# SEARCH
+@app.get("/search", response_model=List[schemas.SearchResult])
+def search(response: Response, q: str, types: Optional[str] = None, limit: int = 20, cursor: Optional[str] = None):
+    """ranked full-text search over sightings, beach reports and conservation actions"""
+    query = database.to_fts_query(q)
+    if not query:
+        raise HTTPException(status_code=400, detail="Search query must contain a word")
+    kinds = types.split(",") if types else list(database.SEARCH_INDEXES)
+    if any(kind not in database.SEARCH_INDEXES for kind in kinds):
+        raise HTTPException(status_code=400, detail=f"types must be from: {', '.join(database.SEARCH_INDEXES)}")
+    if not (1 <= limit <= MAX_SEARCH_LIMIT):
+        raise HTTPException(status_code=400, detail=f"Limit must be between 1 and {MAX_SEARCH_LIMIT}")
+
+    try:
+        results = database.search(query, kinds, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    set_next_cursor(response, results, limit, database.SEARCH_SORT)
+    return [dict(r) for r in results]
+
+# MAP TILES
+@app.get("/map/tiles/{z}/{x}/{y}")
+def get_map_tile(z: int, x: int, y: int, layers: Optional[str] = None):
+    """clustered sightings / beach reports / conservation actions in a z/x/y web mercator tile"""
+    if not tiles.valid_tile(z, x, y):
+        raise HTTPException(status_code=400, detail=f"Invalid tile (zoom 0-{tiles.MAX_ZOOM})")
+    wanted = layers.split(",") if layers else list(tiles.LAYERS)
+    unknown = [layer for layer in wanted if layer not in tiles.LAYERS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"layers must be from: {', '.join(tiles.LAYERS)}")
+
+    tile = tiles.get_tile(z, x, y)
+    return {**tile, "clusters": [c for c in tile["clusters"] if c["layer"] in wanted]}
+
+@app.get("/map/tiles/cache")
+def get_map_tile_cache_stats():
+    return tiles.cache_stats()
+
 # OCEAN DATA ENDPOINTS
 @app.get("/ocean-data/tides/{station_id}")
-def get_tide_data(station_id: str, days: int = 1):
+async def get_tide_data(station_id: str, days: int = 1):
     if days < 1 or days > 30:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 30")
     
-    tide_data = ocean_data.get_tide_data(station_id, days)
+    tide_data = await ocean_data.get_tide_data(station_id, days=days)
     if "error" in tide_data:
         raise HTTPException(status_code=404, detail=tide_data["error"])
     return tide_data
 
+@app.get("/ocean-data/stations/nearest")
+def get_nearest_tide_station(latitude: float, longitude: float):
+    if not ocean_data.validate_coordinates(latitude, longitude):
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    
+    station = ocean_data.find_nearest_station(latitude, longitude)
+    if not station:
+        raise HTTPException(status_code=404, detail="No tide station nearby")
+    return station
+
 @app.get("/ocean-data/weather")
-def get_marine_weather(latitude: float, longitude: float, days: int = 3):
+async def get_marine_weather(latitude: float, longitude: float, days: int = 3):
     if not ocean_data.validate_coordinates(latitude, longitude):
         raise HTTPException(status_code=400, detail="Invalid coordinates")
     if days < 1 or days > 7:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 7")
     
-    weather_data = ocean_data.get_marine_weather(latitude, longitude, days)
+    weather_data = await ocean_data.get_marine_weather(latitude, longitude, days)
     if "error" in weather_data:
         raise HTTPException(status_code=503, detail=weather_data["error"])
     return weather_data
 
 @app.get("/ocean-data/temperature")
-def get_water_temperature(latitude: float, longitude: float, days: int = 7):
+async def get_water_temperature(latitude: float, longitude: float, days: int = 7):
     if not ocean_data.validate_coordinates(latitude, longitude):
         raise HTTPException(status_code=400, detail="Invalid coordinates")
     if days < 1 or days > 7:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 7")
     
-    temp_data = ocean_data.get_water_temperature(latitude, longitude, days)
+    temp_data = await ocean_data.get_water_temperature(latitude, longitude, days)
     if "error" in temp_data:
         raise HTTPException(status_code=503, detail=temp_data["error"])
     return temp_data
 
 @app.get("/ocean-data/conditions")
-def get_ocean_conditions(location_name: str, latitude: float, longitude: float, days: int = 3):
+async def get_ocean_conditions(location_name: str, latitude: float, longitude: float, days: int = 3):
     if not ocean_data.validate_coordinates(latitude, longitude):
         raise HTTPException(status_code=400, detail="Invalid coordinates")
     if days < 1 or days > 7:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 7")
     
-    conditions = ocean_data.get_ocean_conditions(location_name, latitude, longitude, days)
+    conditions = await ocean_data.get_ocean_conditions(location_name, latitude, longitude, days)
     return conditions
 
+@app.post("/ocean-data/conditions/batch")
+async def get_ocean_conditions_batch(request: schemas.OceanConditionsBatchRequest):
+    if not request.locations or len(request.locations) > MAX_BATCH_LOCATIONS:
+        raise HTTPException(status_code=400, detail=f"Provide 1-{MAX_BATCH_LOCATIONS} locations")
+    if request.days < 1 or request.days > 7:
+        raise HTTPException(status_code=400, detail="Days must be between 1 and 7")
+    for loc in request.locations:
+        if not ocean_data.validate_coordinates(loc.latitude, loc.longitude):
+            raise HTTPException(status_code=400, detail=f"Invalid coordinates for {loc.location_name}")
+    locations = [loc.dict() for loc in request.locations]
+    ids = ocean_data.batch_location_ids(locations)
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Location ids must be unique (unnamed locations use their list index)")
+    
+    return await ocean_data.get_ocean_conditions_batch(locations, request.days)
+
+@app.get("/ocean-data/cache")
+def get_ocean_cache_stats():
+    return ocean_data.cache_stats()
+
+@app.get("/ocean-data/prefetch")
+def get_ocean_prefetch_status():
+    return prefetch.scheduler.status()
+
+@app.get("/ocean-data/upstreams")
+def get_ocean_upstream_status():
+    return ocean_data.circuit_stats()
+
 # COMMUNITY STATS
 @app.get("/stats/community")
 def get_community_stats():
     return database.get_community_stats()
 
+@app.get("/stats/timeseries")
+def get_stats_timeseries(metric: str, granularity: str = "week", start: Optional[date] = None,
+                         end: Optional[date] = None, key: Optional[str] = None):
+    if metric not in database.ROLLUPS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(database.ROLLUPS)}")
+    if granularity not in database.TIMESERIES_GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(database.TIMESERIES_GRANULARITIES)}")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    series = database.get_timeseries(
+        metric, granularity,
+        start=start.isoformat() if start else None,
+        end=end.isoformat() if end else None,
+        key=key
+    )
+    return {"metric": metric, "granularity": granularity, "series": series}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,13 +1,48 @@
-import requests
+import asyncio
+import time
+import httpx
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Awaitable, Callable, Optional
+import cache
+import circuit
+import stations
 
 # API CONFIGS
 NOAA_TIDES_URL = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
 OPEN_METEO_MARINE_URL = "https://marine-api.open-meteo.com/v1/marine"
-API_TIMEOUT = 10
+API_TIMEOUT = 10  # per-upstream deadline (seconds)
+CONDITIONS_BUDGET = 12  # overall deadline for one conditions lookup (seconds)
+BATCH_BUDGET = 20  # overall deadline for a batch conditions lookup (seconds)
+MARINE_BATCH_SIZE = 50  # grid points per multi-coordinate Open-Meteo request
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
 
-# NOAA tide stations
+# CACHE CONFIGS (seconds)
+CACHE_TTLS = {
+    "tides": 6 * 3600,  # predictions are fixed for the day
+    "marine": 3600,  # Open-Meteo marine models update hourly at best
+}
+STALE_TTL_FACTOR = 1  # serve stale for up to one extra TTL while refreshing
+NEGATIVE_TTL = 60  # remember upstream errors briefly to avoid hammering
+CACHE_MAX_ENTRIES = 2048
+DISK_CACHE_PATH = "ocean_cache.db"  # shared by uvicorn workers, survives restarts
+DISK_CACHE_MAX_ENTRIES = 20000
+
+# CIRCUIT BREAKER CONFIGS
+BREAKER_WINDOW = 60  # seconds of call history per upstream
+BREAKER_MIN_CALLS = 5  # calls in the window before the breaker may open
+BREAKER_FAILURE_RATE = 0.5  # failed fraction that opens the breaker
+BREAKER_COOLDOWN = 30  # seconds to fail fast before a trial call
+LAST_GOOD_TTL = 24 * 3600  # how long a last-known-good payload may back an outage
+
+# marine requests are snapped to this grid (degrees) before fetching/caching;
+# ~5km, the finest wave model Open-Meteo blends into its marine forecast
+GRID_RESOLUTION = 0.05
+
+# nearest catalogue station must be within this distance, else fall back to name match
+NEAREST_STATION_MAX_KM = 50
+
+# NOAA tide stations by location name (fallback when no coordinates match)
 TIDE_STATIONS = {
     # California
     "san_diego": "9410230", "la_jolla": "9410230", "santa_monica": "9410840",
@@ -20,23 +55,225 @@ TIDE_STATIONS = {
     "boston": "8443970", "new_york": "8518750", "miami": "8723214"
 }
 
-def safe_api_call(url: str, params: dict, timeout: int = API_TIMEOUT) -> dict:
-    """wrapper API calls w error handling"""
+# HTTP CLIENT
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """shared keep-alive HTTP client (one connection pool for all upstreams)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=API_TIMEOUT, limits=HTTP_LIMITS)
+    return _client
+
+async def close_client():
+    """close the shared HTTP client (app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# CIRCUIT BREAKERS (one per upstream)
+breakers = {
+    name: circuit.CircuitBreaker(name, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS,
+                                 failure_rate=BREAKER_FAILURE_RATE, cooldown=BREAKER_COOLDOWN)
+    for name in ("noaa", "open_meteo")
+}
+
+def circuit_stats() -> dict:
+    """state of each upstream circuit breaker"""
+    return {name: breaker.stats() for name, breaker in breakers.items()}
+
+async def safe_api_call(url: str, params: dict, timeout: float = API_TIMEOUT,
+                        upstream: str = None) -> dict:
+    """wrapper API calls w error handling, timeout is a hard deadline for the whole call
+        *upstream: circuit breaker name; fails fast without calling while it is open
+    """
+    breaker = breakers.get(upstream)
+    if breaker and not breaker.allow():
+        return {"success": False, "error": f"{upstream} temporarily unavailable"}
+
+    ok = False
     try:
-        response = requests.get(url, params=params, timeout=timeout)
+        response = await asyncio.wait_for(get_client().get(url, params=params), timeout)
+        # 4xx means a bad request, not an unhealthy upstream
+        ok = response.status_code < 500
         response.raise_for_status()
         return {"success": True, "data": response.json()}
-    except requests.exceptions.RequestException as e:
+    except asyncio.TimeoutError:
+        print(f"API Error: {url} timed out after {timeout}s")
+        return {"success": False, "error": f"Upstream timed out after {timeout}s"}
+    except (httpx.HTTPError, ValueError) as e:
         print(f"API Error: {e}")
         return {"success": False, "error": str(e)}
+    finally:
+        if breaker:
+            breaker.record(ok)
     
-def get_tide_data(station_id: str, date: str = None, days: int = 1) -> dict:
+# REQUEST COALESCING
+_inflight = {}  # key -> upstream fetch task shared by all concurrent callers
+flight_stats = {"upstream_calls": 0, "collapsed_calls": 0}
+
+async def single_flight(key: tuple, fetch: Callable[[], Awaitable[dict]]) -> dict:
+    """run fetch once per key at a time; concurrent callers await the same result"""
+    task = _inflight.get(key)
+    if task is None:
+        flight_stats["upstream_calls"] += 1
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        flight_stats["collapsed_calls"] += 1
+    # shield: a caller timing out must not cancel the fetch for everyone else
+    return await asyncio.shield(task)
+
+# CACHE (in-process LRU in front of the shared on-disk store)
+ocean_cache = cache.TTLCache(max_size=CACHE_MAX_ENTRIES)
+disk_cache = cache.DiskCache(DISK_CACHE_PATH, max_entries=DISK_CACHE_MAX_ENTRIES)
+last_good_cache = cache.TTLCache(max_size=CACHE_MAX_ENTRIES)  # outage fallback, also kept on disk
+_refreshing = {}  # key -> background refresh task
+HISTORY_MAX_KEYS = 500
+_history = OrderedDict()  # key -> (ttl, fetch), most recently requested last
+
+def _as_stale(key: tuple, value: dict) -> dict:
+    """copy of a last-known-good payload flagged as stale"""
+    if key[0] == "marine":
+        return {part: {**payload, "stale": True} for part, payload in value.items()}
+    return {**value, "stale": True}
+
+async def _refresh(key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]],
+                   background: bool = False) -> dict:
+    """fetch from upstream and store the result (once per fetch, however many callers wait on it)"""
+    async def fetch_and_store():
+        return await _store(key, ttl, await fetch())
+    return await _on_failure(key, await single_flight(key, fetch_and_store), background)
+
+def _last_good_key(key: tuple) -> tuple:
+    """disk cache key of a last-known-good payload (its own entry, with a LAST_GOOD_TTL lifetime)"""
+    return ("last_good", *key)
+
+def _persist(key: tuple, result: dict, ttl: float):
+    disk_cache.set(key, result, ttl, ttl * STALE_TTL_FACTOR)
+    disk_cache.set(_last_good_key(key), result, LAST_GOOD_TTL)
+
+async def _store(key: tuple, ttl: float, result: dict) -> dict:
+    """cache a freshly fetched result in memory, on disk and as the last good payload"""
+    if "error" not in result:
+        ocean_cache.set(key, result, ttl, ttl * STALE_TTL_FACTOR)
+        last_good_cache.set(key, result, LAST_GOOD_TTL)
+        await asyncio.to_thread(_persist, key, result, ttl)
+    return result
+
+async def _last_good(key: tuple) -> Optional[dict]:
+    """last good payload from memory, else from disk (survives restarts during an outage)"""
+    fallback, _ = last_good_cache.get(key)
+    if fallback is None:
+        entry = await asyncio.to_thread(disk_cache.get, _last_good_key(key))
+        if entry is not None:
+            fallback, expires_at, _ = entry
+            last_good_cache.set(key, fallback, max(0, expires_at - time.time()))
+    return fallback
+
+async def _on_failure(key: tuple, result: dict, background: bool = False) -> dict:
+    """on failure fall back to the last good payload (marked stale), else cache the error"""
+    if "error" in result and not background:
+        # a failed background refresh keeps serving the stale payload instead
+        fallback = await _last_good(key)
+        if fallback is not None:
+            return _as_stale(key, fallback)
+        ocean_cache.set(key, result, NEGATIVE_TTL)
+    return result
+
+def _schedule_refresh(key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]]):
+    """refresh a stale entry in the background, at most once per key"""
+    if key in _refreshing:
+        return
+    task = asyncio.ensure_future(_refresh(key, ttl, fetch, background=True))
+    _refreshing[key] = task
+    task.add_done_callback(lambda _: _refreshing.pop(key, None))
+
+async def cached_fetch(key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]]) -> dict:
+    """serve key from cache (stale-while-revalidate), fetching on a miss"""
+    _record_request(key, ttl, fetch)
+    value, state = ocean_cache.get(key)
+    if state is None:
+        value, state = await _load_from_disk(key)
+    if state == cache.STALE:
+        _schedule_refresh(key, ttl, fetch)
+    if state is not None:
+        return value
+    return await _refresh(key, ttl, fetch)
+
+async def _load_from_disk(key: tuple) -> tuple:
+    """promote a disk entry (written by any worker) into the memory cache"""
+    entry = await asyncio.to_thread(disk_cache.get, key)
+    if entry is None:
+        return None, None
+    value, expires_at, stale_until = entry
+    now = time.time()
+    ocean_cache.set(key, value, max(0, expires_at - now), stale_until - max(expires_at, now))
+    return value, cache.FRESH if now < expires_at else cache.STALE
+
+def _record_request(key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]]):
+    """remember recently requested keys so the prefetcher can keep them warm"""
+    _history[key] = (ttl, fetch)
+    _history.move_to_end(key)
+    while len(_history) > HISTORY_MAX_KEYS:
+        _history.popitem(last=False)
+
+def recent_requests(limit: int) -> list:
+    """most recently requested (key, ttl, fetch), newest first
+    tide lookups for a day that has passed are rolled forward to the same lookup from today"""
+    today = datetime.now().strftime("%Y%m%d")
+    requests, seen = [], set()
+    for key in list(reversed(_history)):
+        if len(requests) >= limit:
+            break
+        ttl, fetch = _history[key]
+        if key[0] == "tides" and key[2] < today:
+            del _history[key]  # nobody asks for a past day again
+            key, ttl, fetch = tide_request(key[1], days=key[3])
+        if key not in seen:
+            seen.add(key)
+            requests.append((key, ttl, fetch))
+    return requests
+
+def location_requests(latitude: float, longitude: float, days: int = 3) -> list:
+    """(key, ttl, fetch) for everything a conditions lookup at this point needs"""
+    requests = [marine_request(latitude, longitude, days)]
+    station = find_nearest_station(latitude, longitude)
+    if station:
+        requests.append(tide_request(station["id"], days=days))
+    return requests
+
+async def needs_refresh(key: tuple, ahead: float) -> bool:
+    """true if key is missing, stale, or goes stale within `ahead` seconds
+    checks the disk cache too, so keys another worker already refreshed are skipped"""
+    remaining = ocean_cache.remaining(key)
+    if remaining is None or remaining <= ahead:
+        await _load_from_disk(key)
+        remaining = ocean_cache.remaining(key)
+    return remaining is None or remaining <= ahead
+
+async def prefetch(key: tuple, ttl: float, fetch: Callable[[], Awaitable[dict]]) -> dict:
+    """refresh key ahead of expiry (a failure keeps whatever is cached)"""
+    return await _refresh(key, ttl, fetch, background=True)
+
+def cache_stats() -> dict:
+    """ocean data cache and request coalescing counters"""
+    return {**ocean_cache.stats(), "refreshing": len(_refreshing),
+            "in_flight": len(_inflight), **flight_stats, "disk": disk_cache.stats()}
+
+async def get_tide_data(station_id: str, date: str = None, days: int = 1) -> dict:
     """get the tide predictions from NOAA
         *station_id: NOAA station ID 
         *date: YYYYMMDD format (default: today)
         *days: number of days to retrieve (1-30)
        returns a dict with tide predictions
     """
+    return await cached_fetch(*tide_request(station_id, date, days))
+
+def tide_request(station_id: str, date: str = None, days: int = 1) -> tuple:
+    """(cache key, ttl, fetch) for a tide prediction lookup"""
     if not date:
         date = datetime.now().strftime("%Y%m%d")
     end_date = (datetime.now() + timedelta(days=days)).strftime("%Y%m%d")
@@ -54,7 +291,12 @@ def get_tide_data(station_id: str, date: str = None, days: int = 1) -> dict:
         "format": "json"
     }
     
-    result = safe_api_call(NOAA_TIDES_URL, params)
+    key = ("tides", station_id, date, days)
+    return key, CACHE_TTLS["tides"], lambda: _fetch_tide_data(station_id, params)
+
+async def _fetch_tide_data(station_id: str, params: dict) -> dict:
+    """call NOAA and parse the hi/lo predictions"""
+    result = await safe_api_call(NOAA_TIDES_URL, params, upstream="noaa")
     if not result["success"] or "predictions" not in result["data"]:
         return {"error": "No tide data available", "station_id": station_id}
         
@@ -69,26 +311,104 @@ def get_tide_data(station_id: str, date: str = None, days: int = 1) -> dict:
         
     return {"station_id": station_id, "tides": tides, "units": "feet"}
         
-# MARINE WEATHER 
-def get_marine_weather(latitude: float, longitude: float, days: int = 3) -> dict:
-    """ get marine weather forecast
-        returns dict with marine weather data
+# MARINE DATA (weather + water temperature share one Open-Meteo request)
+MARINE_HOURLY = "wave_height,wave_direction,wave_period,wind_wave_height,swell_wave_height"
+MARINE_DAILY = "wave_height_max,wave_direction_dominant,wave_period_max,ocean_surface_temperature_mean"
+
+async def get_marine_data(latitude: float, longitude: float, days: int = 3) -> dict:
+    """ get marine weather and water temperature in a single upstream call
+        coordinates are snapped to the model grid, so nearby requests share a fetch
+        returns dict with "weather" and "temperature" payloads
     """
+    return await cached_fetch(*marine_request(latitude, longitude, days))
+
+def marine_request(latitude: float, longitude: float, days: int = 3) -> tuple:
+    """(cache key, ttl, fetch) for a marine lookup on the snapped grid point"""
+    latitude, longitude = snap_coordinates(latitude, longitude)
     params = {
         "latitude": latitude,
         "longitude": longitude,
-        "hourly": "wave_height,wave_direction,wave_period,wind_wave_height,swell_wave_height",
-        "daily": "wave_height_max,wave_direction_dominant,wave_period_max",
+        "hourly": MARINE_HOURLY,
+        "daily": MARINE_DAILY,
         "timezone": "auto",
         "forecast_days": min(days, 7)
     }
-        
-    result = safe_api_call(OPEN_METEO_MARINE_URL, params)
+    
+    key = ("marine", latitude, longitude, params["forecast_days"])
+    return key, CACHE_TTLS["marine"], lambda: _fetch_marine_data(latitude, longitude, params)
+
+async def _fetch_marine_data(latitude: float, longitude: float, params: dict) -> dict:
+    """call Open-Meteo marine and split the response into weather + temperature"""
+    result = await safe_api_call(OPEN_METEO_MARINE_URL, params, upstream="open_meteo")
     
     if not result["success"]:
         return {"error": result["error"]}
-    data = result["data"]
-        
+    return split_marine_data(latitude, longitude, result["data"])
+
+def split_marine_data(latitude: float, longitude: float, data: dict) -> dict:
+    """weather + temperature payloads from one Open-Meteo marine response"""
+    return {
+        "weather": parse_marine_weather(latitude, longitude, data),
+        "temperature": parse_water_temperature(latitude, longitude, data)
+    }
+
+async def _fetch_marine_batch(cells: list, days: int) -> dict:
+    """one Open-Meteo call for many snapped grid points
+    return {"results": [payload per cell]} or {"error": ...}"""
+    params = {
+        "latitude": ",".join(str(lat) for lat, _ in cells),
+        "longitude": ",".join(str(lon) for _, lon in cells),
+        "hourly": MARINE_HOURLY,
+        "daily": MARINE_DAILY,
+        "timezone": "auto",
+        "forecast_days": min(days, 7)
+    }
+    result = await safe_api_call(OPEN_METEO_MARINE_URL, params, upstream="open_meteo")
+    if not result["success"]:
+        return {"error": result["error"]}
+    
+    # a single location comes back as an object, several as a list in request order
+    data = result["data"] if isinstance(result["data"], list) else [result["data"]]
+    if len(data) != len(cells):
+        return {"error": "Unexpected marine batch response"}
+    return {"results": [split_marine_data(lat, lon, item) for (lat, lon), item in zip(cells, data)]}
+
+async def get_marine_data_batch(points: list, days: int = 3) -> dict:
+    """ marine data for many points; cache misses share multi-coordinate requests
+    return dict of snapped (lat, lon) -> marine payload (or error) """
+    requests = {}
+    for latitude, longitude in points:
+        cell = snap_coordinates(latitude, longitude)
+        requests.setdefault(cell, marine_request(*cell, days))
+    
+    results, missing = {}, []
+    for cell, (key, ttl, fetch) in requests.items():
+        _record_request(key, ttl, fetch)
+        value, state = ocean_cache.get(key)
+        if state is None:
+            value, state = await _load_from_disk(key)
+        if state == cache.STALE:
+            _schedule_refresh(key, ttl, fetch)
+        if state is not None:
+            results[cell] = value
+        else:
+            missing.append(cell)
+    
+    async def fetch_chunk(chunk):
+        fetched = await _fetch_marine_batch(chunk, days)
+        for i, cell in enumerate(chunk):
+            value = fetched["results"][i] if "results" in fetched else {"error": fetched["error"]}
+            key, ttl, _ = requests[cell]
+            # same caching, fallback and negative caching as a single fetch
+            results[cell] = await _on_failure(key, await _store(key, ttl, value))
+    
+    chunks = [missing[i:i + MARINE_BATCH_SIZE] for i in range(0, len(missing), MARINE_BATCH_SIZE)]
+    await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    return results
+
+# MARINE WEATHER 
+def parse_marine_weather(latitude: float, longitude: float, data: dict) -> dict:
+    """ build the marine weather payload from an Open-Meteo marine response """
     # parse current conditions (first hourly entry)
     current = {}
     if "hourly" in data and data["hourly"]["time"]:
@@ -118,25 +438,16 @@ def get_marine_weather(latitude: float, longitude: float, days: int = 3) -> dict
         "forecast": daily
     }
 
-# WATER TEMPERATURE 
-def get_water_temperature(latitude: float, longitude: float, days: int = 7) -> dict:
-    """ get ocean water temperature data
-    return dict with water temperature data """
+async def get_marine_weather(latitude: float, longitude: float, days: int = 3) -> dict:
+    """ get marine weather forecast
+        returns dict with marine weather data
+    """
+    marine = await get_marine_data(latitude, longitude, days)
+    return marine.get("weather", marine)
 
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "daily": "ocean_surface_temperature_mean",
-        "timezone": "auto",
-        "forecast_days": min(days, 7)
-    }
-        
-    result = safe_api_call(OPEN_METEO_MARINE_URL, params)
-    
-    if not result["success"]:
-        return {"error": result["error"]}
-    data = result["data"]
-        
+# WATER TEMPERATURE 
+def parse_water_temperature(latitude: float, longitude: float, data: dict) -> dict:
+    """ build the water temperature payload from an Open-Meteo marine response """
     temps = []
     if "daily" in data:
         for i in range(len(data["daily"]["time"])):
@@ -149,11 +460,32 @@ def get_water_temperature(latitude: float, longitude: float, days: int = 7) -> d
         "location": {"latitude": latitude, "longitude": longitude},
         "temperature_data": temps
     }
+
+async def get_water_temperature(latitude: float, longitude: float, days: int = 7) -> dict:
+    """ get ocean water temperature data
+    return dict with water temperature data """
+    marine = await get_marine_data(latitude, longitude, days)
+    return marine.get("temperature", marine)
         
 # LOCATION QUERIES
-def find_tide_station(location_name: str) -> Optional[str]:
-    """ find tide station for given location
+def find_nearest_station(latitude: float, longitude: float,
+                         max_km: float = None) -> Optional[dict]:
+    """ nearest NOAA tide station within max_km (default NEAREST_STATION_MAX_KM)
+    return station dict with distance_km, or None """
+    station, distance_km = stations.get_catalogue().nearest(latitude, longitude)
+    if station is None or distance_km > (max_km or NEAREST_STATION_MAX_KM):
+        return None
+    return {**station, "distance_km": round(distance_km, 2)}
+
+def find_tide_station(location_name: str, latitude: float = None,
+                      longitude: float = None) -> Optional[str]:
+    """ find tide station for given location, nearest by coordinates first
     return station ID or None """
+    if latitude is not None and longitude is not None:
+        station = find_nearest_station(latitude, longitude)
+        if station:
+            return station["id"]
+
     location_name = location_name.lower().replace(" ", "_")
     
     # exact match
@@ -166,9 +498,11 @@ def find_tide_station(location_name: str) -> Optional[str]:
     
     return None
 
-def get_ocean_conditions(location_name: str, latitude: float, 
-                                     longitude: float, days: int = 3) -> dict:
+async def get_ocean_conditions(location_name: str, latitude: float, 
+                                     longitude: float, days: int = 3,
+                                     budget: float = None) -> dict:
     """ get complete ocean conditions for a location
+    upstreams are fetched concurrently; anything not back within budget is dropped
     return dict with all the ocean data (tides, weather, temperature) """
 
     result = {
@@ -176,27 +510,101 @@ def get_ocean_conditions(location_name: str, latitude: float,
         "timestamp": datetime.now().isoformat(),
         "data": {}
     }
-        
+    
+    fetches = {}
     # get tide data if station available
-    station_id = find_tide_station(location_name)
+    station_id = find_tide_station(location_name, latitude, longitude)
     if station_id:
-        tide_data = get_tide_data(station_id, days)
-        if "error" not in tide_data:
-            result["data"]["tides"] = tide_data
+        fetches["tides"] = get_tide_data(station_id, days=days)
+    # weather + water temp come back from one marine call
+    fetches["marine"] = get_marine_data(latitude, longitude, days)
     
-    # get marine weather
-    weather = get_marine_weather(latitude, longitude, days)
-    if "error" not in weather:
-        result["data"]["weather"] = weather
+    tasks = {key: asyncio.ensure_future(fetch) for key, fetch in fetches.items()}
+    done, pending = await asyncio.wait(tasks.values(), timeout=budget or CONDITIONS_BUDGET)
+    for task in pending:
+        task.cancel()
     
-    # get water temp
-    temp = get_water_temperature(latitude, longitude, days)
-    if "error" not in temp:
-        result["data"]["temperature"] = temp
+    for key, task in tasks.items():
+        if task not in done or task.exception():
+            continue
+        data = task.result()
+        if "error" in data:
+            continue
+        if key == "marine":
+            result["data"].update(data)
+        else:
+            result["data"][key] = data
     
     return result
 
+def batch_location_ids(locations: list) -> list:
+    """result map key of each batch location: its id, else its list index"""
+    return [loc.get("id") or str(index) for index, loc in enumerate(locations)]
+
+async def get_ocean_conditions_batch(locations: list, days: int = 3,
+                                     budget: float = None) -> dict:
+    """ get ocean conditions for many locations at once
+        *locations: dicts with id (optional), location_name, latitude, longitude
+    tides are deduped by station and marine data by grid cell, then fetched concurrently
+    return dict with a per-location result map; failures are reported per location """
+    entries = []
+    for loc_id, loc in zip(batch_location_ids(locations), locations):
+        entries.append({
+            "id": loc_id,
+            "location": {"name": loc["location_name"], "latitude": loc["latitude"], "longitude": loc["longitude"]},
+            "station_id": find_tide_station(loc["location_name"], loc["latitude"], loc["longitude"]),
+            "cell": snap_coordinates(loc["latitude"], loc["longitude"])
+        })
+    
+    stations_needed = sorted({e["station_id"] for e in entries if e["station_id"]})
+    tide_tasks = {sid: asyncio.ensure_future(get_tide_data(sid, days=days)) for sid in stations_needed}
+    marine_task = asyncio.ensure_future(get_marine_data_batch([e["cell"] for e in entries], days))
+    
+    tasks = [marine_task, *tide_tasks.values()]
+    done, pending = await asyncio.wait(tasks, timeout=budget or BATCH_BUDGET)
+    for task in pending:
+        task.cancel()
+    
+    def outcome(task):
+        if task not in done:
+            return {"error": "Timed out"}
+        if task.exception():
+            return {"error": str(task.exception())}
+        return task.result()
+    
+    marine = outcome(marine_task)
+    tides = {sid: outcome(task) for sid, task in tide_tasks.items()}
+    
+    results = {}
+    for e in entries:
+        data, errors = {}, {}
+        if e["station_id"]:
+            tide = tides[e["station_id"]]
+            if "error" in tide:
+                errors["tides"] = tide["error"]
+            else:
+                data["tides"] = tide
+        cell_data = marine if "error" in marine else marine.get(e["cell"], {"error": "No marine data"})
+        if "error" in cell_data:
+            errors["weather"] = errors["temperature"] = cell_data["error"]
+        else:
+            data.update(cell_data)
+        results[e["id"]] = {"location": e["location"], "data": data, "errors": errors}
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "unique_stations": len(stations_needed),
+        "unique_cells": len({e["cell"] for e in entries}),
+        "results": results
+    }
+
 # HELPER
+def snap_coordinates(latitude: float, longitude: float, resolution: float = None) -> tuple:
+    """snap lat/lon to the nearest grid point (default GRID_RESOLUTION)"""
+    resolution = resolution or GRID_RESOLUTION
+    snap = lambda value: round(round(value / resolution) * resolution, 6)
+    return snap(latitude), snap(longitude)
+
 def validate_coordinates(latitude: float, longitude: float) -> bool:
     """validate latitude and longitude"""
     return -90 <= latitude <= 90 and -180 <= longitude <= 180
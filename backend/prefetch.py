@@ -0,0 +1,119 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+import database
+import ocean_data
+
+# PREFETCH CONFIGS
+PREFETCH_INTERVAL = 300  # seconds between cycles
+PREFETCH_AHEAD = 600  # refresh entries going stale within this many seconds
+PREFETCH_LOOKBACK_DAYS = 7  # beach reports / sightings this recent mark a hot location
+PREFETCH_HOT_LOCATIONS = 50  # hot locations taken from the database per cycle
+PREFETCH_RECENT_REQUESTS = 200  # recently requested keys considered per cycle
+PREFETCH_CONCURRENCY = 4  # upstream fetches in flight at once
+PREFETCH_MAX_PER_CYCLE = 100  # upstream fetch budget per cycle
+PREFETCH_RATE = 5  # max upstream fetches started per second
+
+
+class PrefetchScheduler:
+    """periodically refreshes ocean data for hot locations before it expires"""
+
+    def __init__(self, interval: float = PREFETCH_INTERVAL, ahead: float = PREFETCH_AHEAD,
+                 concurrency: int = PREFETCH_CONCURRENCY, max_per_cycle: int = PREFETCH_MAX_PER_CYCLE,
+                 rate: float = PREFETCH_RATE):
+        self.interval = interval
+        self.ahead = ahead
+        self.concurrency = concurrency
+        self.max_per_cycle = max_per_cycle
+        self.rate = rate
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.last_run: Optional[str] = None
+        self.last_duration_s = 0.0
+        self.last_due = 0
+        self.last_refreshed = 0
+        self.last_failed = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Prefetch error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _candidates(self) -> list:
+        """(key, ttl, fetch) for hot locations, recent requests first, deduped by cache key"""
+        since = (date.today() - timedelta(days=PREFETCH_LOOKBACK_DAYS)).isoformat()
+        hot = await asyncio.to_thread(database.get_recent_locations, since, PREFETCH_HOT_LOCATIONS)
+
+        candidates = ocean_data.recent_requests(PREFETCH_RECENT_REQUESTS)
+        for row in hot:
+            candidates.extend(ocean_data.location_requests(row["latitude"], row["longitude"]))
+
+        seen, unique = set(), []
+        for key, ttl, fetch in candidates:
+            if key not in seen:
+                seen.add(key)
+                unique.append((key, ttl, fetch))
+        return unique
+
+    async def run_once(self):
+        """refresh everything hot that is missing or about to go stale, within budget"""
+        started = time.monotonic()
+        due = [c for c in await self._candidates() if await ocean_data.needs_refresh(c[0], self.ahead)]
+        due = due[:self.max_per_cycle]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = {"refreshed": 0, "failed": 0}
+
+        async def refresh(key, ttl, fetch):
+            async with semaphore:
+                result = await ocean_data.prefetch(key, ttl, fetch)
+            results["failed" if "error" in result else "refreshed"] += 1
+
+        tasks = []
+        for key, ttl, fetch in due:
+            tasks.append(asyncio.create_task(refresh(key, ttl, fetch)))
+            await asyncio.sleep(1 / self.rate)  # spread upstream calls out
+        await asyncio.gather(*tasks)
+
+        self.cycles += 1
+        self.last_run = datetime.now().isoformat()
+        self.last_duration_s = round(time.monotonic() - started, 3)
+        self.last_due = len(due)
+        self.last_refreshed = results["refreshed"]
+        self.last_failed = results["failed"]
+        self.last_error = None
+
+    def status(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_s": self.interval,
+            "cycles": self.cycles,
+            "last_run": self.last_run,
+            "last_duration_s": self.last_duration_s,
+            "last_due": self.last_due,
+            "last_refreshed": self.last_refreshed,
+            "last_failed": self.last_failed,
+            "last_error": self.last_error
+        }
+
+
+scheduler = PrefetchScheduler()
@@ -48,6 +48,7 @@ class MarineSightingResponse(BaseModel):
     notes: Optional[str] = None
     created_at: str
     user_name: Optional[str] = None
+    distance_km: Optional[float] = None  # set on near= queries
 
 # BEACH REPORT SCHEMAS
 class BeachReportCreate(BaseModel):
@@ -77,6 +78,7 @@ class BeachReportResponse(BaseModel):
     created_at: str
     user_name: Optional[str] = None
     quality_score: Optional[float] = None 
+    distance_km: Optional[float] = None  # set on near= queries
 
 #CONSERVATION ACTION SCHEMAS
 class ConservationActionCreate(BaseModel):
@@ -105,6 +107,18 @@ class ConservationActionResponse(BaseModel):
     date_completed: date
     created_at: str
     user_name: Optional[str] = None
+    distance_km: Optional[float] = None  # set on near= queries
+
+# OCEAN DATA SCHEMAS
+class OceanLocation(BaseModel):
+    id: Optional[str] = None  # key in the batch result map (default: list index)
+    location_name: str
+    latitude: float
+    longitude: float
+
+class OceanConditionsBatchRequest(BaseModel):
+    locations: List[OceanLocation]
+    days: int = 3
 
 class CommunityStatsResponse(BaseModel):
     total_actions: int
@@ -115,3 +129,33 @@ class CommunityStatsResponse(BaseModel):
     top_contributors: list
     recent_actions: list
 
+class ActivityCounts(BaseModel):
+    sightings: int
+    reports: int
+    actions: int
+
+class DashboardResponse(BaseModel):
+    community: dict
+    totals: ActivityCounts
+    user: ActivityCounts
+    recent_sightings: List[MarineSightingResponse]
+    recent_reports: List[BeachReportResponse]
+    recent_actions: List[ConservationActionResponse]
+
+class SearchResult(BaseModel):
+    type: str  # sightings | beach_reports | conservation_actions
+    id: int
+    title: str
+    activity_date: Optional[date] = None
+    snippet: str
+    rank: float
+
+class BulkRowError(BaseModel):
+    line: int
+    errors: List[str]
+
+class BulkImportReport(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkRowError]  # first ingest.MAX_REPORTED_ERRORS failures
@@ -0,0 +1,114 @@
+import csv
+import math
+import os
+from typing import List, Optional, Tuple
+
+STATIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tide_stations.csv")
+NOAA_STATIONS_URL = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations.json"
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    """lat/lon -> point on the unit sphere, so straight-line distance orders like great-circle"""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+def chord_to_km(chord: float) -> float:
+    """straight-line distance on the unit sphere -> great-circle km"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+# SPATIAL INDEX
+class KDTree:
+    """static 3-d tree over unit-sphere points for O(log n) nearest-neighbour lookup"""
+
+    def __init__(self, points: List[Tuple[float, float, float]], items: list):
+        self.size = len(items)
+        self._root = self._build(list(zip(points, items)), 0)
+
+    def _build(self, entries: list, depth: int):
+        if not entries:
+            return None
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[0][axis])
+        mid = len(entries) // 2
+        point, item = entries[mid]
+        return (axis, point, item,
+                self._build(entries[:mid], depth + 1),
+                self._build(entries[mid + 1:], depth + 1))
+
+    def nearest(self, point: Tuple[float, float, float]) -> Tuple[Optional[object], float]:
+        """closest item and its straight-line distance"""
+        best = [None, float("inf")]  # item, squared distance
+
+        def search(node):
+            if node is None:
+                return
+            axis, node_point, item, left, right = node
+            dist2 = sum((a - b) ** 2 for a, b in zip(point, node_point))
+            if dist2 < best[1]:
+                best[0], best[1] = item, dist2
+            diff = point[axis] - node_point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            if diff * diff < best[1]:  # the other side may still hold something closer
+                search(far)
+
+        search(self._root)
+        return best[0], math.sqrt(best[1])
+
+
+# STATION CATALOGUE
+class StationCatalogue:
+    """NOAA tide prediction stations with nearest-station lookup by coordinates"""
+
+    def __init__(self, stations: List[dict]):
+        self.stations = stations
+        self._index = KDTree(
+            [to_unit_vector(s["latitude"], s["longitude"]) for s in stations], stations
+        )
+
+    @classmethod
+    def load(cls, path: str = STATIONS_FILE) -> "StationCatalogue":
+        with open(path, newline="") as f:
+            stations = [
+                {"id": row["id"], "name": row["name"], "state": row["state"],
+                 "latitude": float(row["latitude"]), "longitude": float(row["longitude"])}
+                for row in csv.DictReader(f)
+            ]
+        return cls(stations)
+
+    def nearest(self, latitude: float, longitude: float) -> Tuple[Optional[dict], float]:
+        """closest station and its distance in km"""
+        station, chord = self._index.nearest(to_unit_vector(latitude, longitude))
+        return station, chord_to_km(chord)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+
+_catalogue: Optional[StationCatalogue] = None
+
+def get_catalogue() -> StationCatalogue:
+    """bundled station catalogue, loaded and indexed once"""
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = StationCatalogue.load()
+    return _catalogue
+
+
+def download_catalogue(path: str = STATIONS_FILE):
+    """refresh the bundled file from NOAA's metadata API (all tide prediction stations)"""
+    import httpx
+    response = httpx.get(NOAA_STATIONS_URL, params={"type": "tidepredictions"}, timeout=60)
+    response.raise_for_status()
+    stations = response.json()["stations"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "state", "latitude", "longitude"])
+        for s in sorted(stations, key=lambda s: s["id"]):
+            writer.writerow([s["id"], s["name"], s.get("state") or "", s["lat"], s["lng"]])
+    print(f"Wrote {len(stations)} stations to {path}")
+
+if __name__ == "__main__":
+    download_catalogue()
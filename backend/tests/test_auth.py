@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+import auth
+
+
+def test_hash_executor_is_recreated_after_shutdown():
+    assert asyncio.run(auth.run_hash_job(pow, 2, 3)) == 8
+    auth.shutdown_hash_executor()
+    # a second app start in the same process
+    assert asyncio.run(auth.run_hash_job(pow, 2, 4)) == 16
+    auth.shutdown_hash_executor()
+
+
+def test_cancelled_caller_keeps_its_job_counted_until_it_finishes():
+    release = threading.Event()
+
+    async def main():
+        caller = asyncio.ensure_future(auth.run_hash_job(release.wait))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        # the request is gone but bcrypt would still be running on the executor
+        assert auth.hash_stats()["jobs"] == 1
+        release.set()
+        await asyncio.sleep(0.05)
+        assert auth.hash_stats()["jobs"] == 0
+
+    asyncio.run(main())
+    auth.shutdown_hash_executor()
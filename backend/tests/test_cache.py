@@ -0,0 +1,15 @@
+import cache
+
+
+def test_disk_cache_trims_to_max_entries_every_few_writes(tmp_path):
+    disk = cache.DiskCache(str(tmp_path / "cache.db"), max_entries=10, trim_every=5)
+    for i in range(14):
+        disk.set(("key", i), i, ttl=60 + i)
+    # last trim ran at write 10; writes 11-14 are not trimmed yet
+    assert disk.stats()["size"] == 14
+
+    disk.set(("key", 14), 14, ttl=74)
+    assert disk.stats()["size"] == 10
+    # the entries closest to expiry went first
+    assert disk.get(("key", 0)) is None and disk.get(("key", 14))[0] == 14
+    disk.close()
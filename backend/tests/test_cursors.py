@@ -0,0 +1,29 @@
+import base64
+import json
+
+import pytest
+
+import database
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    row = {"date_spotted": "2024-06-01", "created_at": "2024-06-01 10:00:00", "id": 7}
+    cursor = database.encode_cursor(row, database.SIGHTING_SORT)
+    assert database.decode_cursor(cursor, database.SIGHTING_SORT) == ("2024-06-01", "2024-06-01 10:00:00", 7)
+    assert database.decode_cursor(raw_cursor([1.5, "sighting", 3]), database.SEARCH_SORT) == (1.5, "sighting", 3)
+
+
+@pytest.mark.parametrize("values", [
+    ["2024-06-01", "7"],  # id as a string
+    ["2024-06-01", True],
+    [20240601, 7],  # date as a number
+    [None, 7],
+    ["2024-06-01", 7.5],
+])
+def test_cursor_values_of_the_wrong_type_are_rejected(values):
+    with pytest.raises(ValueError):
+        database.decode_cursor(raw_cursor(values), database.REPORT_SORT)
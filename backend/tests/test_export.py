@@ -0,0 +1,25 @@
+def add_sightings(db, count):
+    user_id = db.create_user("diver@example.com", "Diver", "not-a-hash")
+    for i in range(count):
+        db.create_marine_sighting(user_id, f"Dolphin {i}", "mammal", "La Jolla", 32.85, -117.27, "2024-06-01")
+    return user_id
+
+
+def test_export_reads_every_row_in_id_order(db):
+    add_sightings(db, 25)
+    chunks = list(db.iter_export("sightings", chunk_size=10))
+
+    assert [len(rows) for rows in chunks] == [10, 10, 5]
+    ids = [row["id"] for rows in chunks for row in rows]
+    assert ids == sorted(ids) and len(set(ids)) == 25
+
+
+def test_open_exports_do_not_hold_pool_connections(db):
+    add_sightings(db, 10)
+    # more half-read exports than the read pool has connections
+    exports = [db.iter_export("sightings", chunk_size=2) for _ in range(db.POOL_SIZE + 1)]
+    for export in exports:
+        next(export)
+
+    assert len(db.get_all_sightings()) == 10
+    assert all(len(rows) == 8 for rows in ([row for chunk in export for row in chunk] for export in exports))
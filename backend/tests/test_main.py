@@ -0,0 +1,51 @@
+import base64
+import json
+
+from fastapi.testclient import TestClient
+
+import cache
+import main
+
+client = TestClient(main.app)
+
+
+def test_batch_conditions_rejects_duplicate_location_ids():
+    locations = [
+        {"id": "1", "location_name": "La Jolla", "latitude": 32.85, "longitude": -117.27},
+        # no id: keyed by its index, "1", which collides with the explicit id above
+        {"location_name": "Santa Monica", "latitude": 34.01, "longitude": -118.5},
+    ]
+    response = client.post("/ocean-data/conditions/batch", json={"locations": locations})
+
+    assert response.status_code == 400
+    assert "unique" in response.json()["detail"]
+
+
+def test_write_invalidates_only_the_summary_and_the_writers_dashboard():
+    main.dashboard_cache.clear()
+    for key in ("summary", ("user", 1), ("user", 2)):
+        main.dashboard_cache.set(key, {"cached": True}, 60)
+
+    main.invalidate_after_write(1, "sightings", {"latitude": None, "longitude": None, "species_type": "mammal"}, 1)
+
+    assert main.dashboard_cache.get("summary")[0] is None
+    assert main.dashboard_cache.get(("user", 1))[0] is None
+    assert main.dashboard_cache.get(("user", 2))[0] == {"cached": True}
+    main.dashboard_cache.clear()
+
+
+def test_shutdown_clears_auth_caches(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(main.ocean_data, "disk_cache", cache.DiskCache(str(tmp_path / "ocean_cache.db")))
+    with TestClient(main.app):
+        main.auth.user_cache.set("diver@example.com", ("row",), 60)
+        main.auth.token_cache.set("token", "diver@example.com", 60)
+
+    assert len(main.auth.user_cache) == 0 and len(main.auth.token_cache) == 0
+
+
+def test_cursor_with_wrong_value_types_is_a_400(db):
+    cursor = base64.urlsafe_b64encode(json.dumps(["2024-06-01", "2024-06-01", "7"]).encode()).decode()
+
+    response = client.get("/sightings", params={"cursor": cursor})
+
+    assert response.status_code == 400
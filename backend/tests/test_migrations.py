@@ -0,0 +1,24 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+def test_failed_migration_stops_startup(db, monkeypatch):
+    applied = db.MIGRATIONS[-1][0]
+    monkeypatch.setattr(db, "MIGRATIONS", [*db.MIGRATIONS,
+                                           (applied + 1, "broken", ("ALTER TABLE missing ADD COLUMN x",)),
+                                           (applied + 2, "never reached", ("CREATE TABLE reached (x)",))])
+
+    with pytest.raises(sqlite3.OperationalError):
+        db.init_database()
+    with db.get_db(readonly=True) as conn:
+        assert db.get_schema_version(conn) == applied
+
+
+def test_startup_rejects_old_sqlite(db, monkeypatch):
+    monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 31, 1))
+
+    with pytest.raises(RuntimeError, match="3.35.0"):
+        db.init_database()
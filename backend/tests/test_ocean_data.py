@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import cache
+import circuit
+import ocean_data
+
+# a coastal point with a catalogue tide station nearby, so both upstreams are called
+SAN_DIEGO = ("San Diego", 32.7157, -117.1611)
+
+TIDES_BODY = {"predictions": [{"t": "2024-06-01 04:12", "v": "5.1", "type": "H"}]}
+MARINE_BODY = {
+    "hourly": {"time": ["2024-06-01T00:00"], "wave_height": [1.2], "wave_direction": [270],
+               "wave_period": [9.0], "wind_wave_height": [0.4], "swell_wave_height": [1.0]},
+    "daily": {"time": ["2024-06-01"], "wave_height_max": [1.6], "wave_direction_dominant": [265],
+              "wave_period_max": [11.0], "ocean_surface_temperature_mean": [18.5]},
+}
+
+
+class StubUpstreams:
+    """httpx handler standing in for NOAA and Open-Meteo, with a per-host delay"""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.calls = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.calls.append(host)
+        await asyncio.sleep(self.delays.get(host, 0))
+        body = TIDES_BODY if "noaa" in host else MARINE_BODY
+        points = request.url.params.get("latitude", "").count(",") + 1
+        if "noaa" not in host and points > 1:
+            body = [MARINE_BODY] * points  # multi-coordinate response
+        return httpx.Response(200, json=body)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(tmp_path, monkeypatch):
+    """empty caches and closed breakers so every lookup reaches the stub"""
+    monkeypatch.setattr(ocean_data, "ocean_cache", cache.TTLCache())
+    monkeypatch.setattr(ocean_data, "last_good_cache", cache.TTLCache())
+    disk = cache.DiskCache(str(tmp_path / "ocean_cache.db"))
+    monkeypatch.setattr(ocean_data, "disk_cache", disk)
+    monkeypatch.setattr(ocean_data, "breakers", {name: circuit.CircuitBreaker(name) for name in ocean_data.breakers})
+    monkeypatch.setattr(ocean_data, "flight_stats", {"upstream_calls": 0, "collapsed_calls": 0})
+    yield
+    disk.close()
+
+
+def run_with_stub(stub, coro_fn):
+    """run coro_fn() with ocean_data.get_client() returning a client on the stub transport"""
+    async def main():
+        ocean_data._client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+        try:
+            return await coro_fn()
+        finally:
+            await ocean_data.close_client()
+    return asyncio.run(main())
+
+
+def test_upstreams_are_fetched_concurrently():
+    stub = StubUpstreams({"api.tidesandcurrents.noaa.gov": 0.3, "marine-api.open-meteo.com": 0.3})
+    started = time.perf_counter()
+    result = run_with_stub(stub, lambda: ocean_data.get_ocean_conditions(*SAN_DIEGO))
+    elapsed = time.perf_counter() - started
+
+    assert sorted(stub.calls) == ["api.tidesandcurrents.noaa.gov", "marine-api.open-meteo.com"]
+    assert set(result["data"]) == {"tides", "weather", "temperature"}
+    # fan-out: total time follows the slowest upstream, not the sum of both
+    assert elapsed < 0.55
+
+
+def test_slow_upstream_hits_its_own_timeout():
+    stub = StubUpstreams({"marine-api.open-meteo.com": 1})
+    result = run_with_stub(stub, lambda: ocean_data.safe_api_call(
+        ocean_data.OPEN_METEO_MARINE_URL, {}, timeout=0.1, upstream="open_meteo"))
+
+    assert result == {"success": False, "error": "Upstream timed out after 0.1s"}
+    assert ocean_data.breakers["open_meteo"].stats()["failures_in_window"] == 1
+
+
+def test_conditions_budget_drops_late_upstreams(monkeypatch):
+    monkeypatch.setattr(ocean_data, "CONDITIONS_BUDGET", 0.2)
+    stub = StubUpstreams({"marine-api.open-meteo.com": 2})
+    started = time.perf_counter()
+    result = run_with_stub(stub, lambda: ocean_data.get_ocean_conditions(*SAN_DIEGO))
+    elapsed = time.perf_counter() - started
+
+    # tides made it in time; marine was cut off at the budget instead of waited for
+    assert set(result["data"]) == {"tides"}
+    assert elapsed < 1
+
+
+def test_needs_refresh_skips_keys_another_worker_refreshed():
+    key = ("marine", 32.7, -117.15, 3)
+    # written to the shared disk cache by another worker, not in this one's memory yet
+    ocean_data.disk_cache.set(key, {"weather": {}}, 3600, 3600)
+
+    assert not asyncio.run(ocean_data.needs_refresh(key, ahead=600))
+    assert ocean_data.ocean_cache.remaining(key) > 600
+    assert asyncio.run(ocean_data.needs_refresh(key, ahead=7200))
+    assert asyncio.run(ocean_data.needs_refresh(("marine", 0.0, 0.0, 3), ahead=600))
+
+
+def test_marine_batch_makes_one_upstream_call_for_all_cells():
+    stub = StubUpstreams()
+    points = [(32.7, -117.15), (33.0, -117.3), (34.0, -118.5)]
+    results = run_with_stub(stub, lambda: ocean_data.get_marine_data_batch(points))
+
+    assert stub.calls == ["marine-api.open-meteo.com"]
+    assert len(results) == 3 and all("weather" in value for value in results.values())
+    # cells filled from the shared response are cached without counting as upstream calls
+    assert ocean_data.flight_stats == {"upstream_calls": 0, "collapsed_calls": 0}
+    assert asyncio.run(ocean_data.get_marine_data(*points[0])) == results[ocean_data.snap_coordinates(*points[0])]
+
+
+def test_concurrent_callers_share_one_fetch_and_one_store(monkeypatch):
+    writes = []
+    store = ocean_data.disk_cache.set
+    monkeypatch.setattr(ocean_data.disk_cache, "set", lambda *args: writes.append(args[0]) or store(*args))
+    stub = StubUpstreams({"marine-api.open-meteo.com": 0.1})
+
+    async def many():
+        return await asyncio.gather(*(ocean_data.get_marine_weather(32.7, -117.15) for _ in range(50)))
+    results = run_with_stub(stub, many)
+
+    assert stub.calls == ["marine-api.open-meteo.com"]
+    # one fetch: the entry and its last-known-good copy, once
+    key = ocean_data.marine_request(32.7, -117.15)[0]
+    assert writes == [key, ocean_data._last_good_key(key)]
+    assert all(result == results[0] for result in results)
+
+
+def test_recent_tide_requests_roll_forward_to_today(monkeypatch):
+    monkeypatch.setattr(ocean_data, "_history", ocean_data.OrderedDict())
+    today = ocean_data.datetime.now().strftime("%Y%m%d")
+    ocean_data._record_request(*ocean_data.tide_request("9410230", "20240101", 3))
+    ocean_data._record_request(*ocean_data.tide_request("9410230", days=3))
+    ocean_data._record_request(*ocean_data.marine_request(32.7, -117.15))
+
+    keys = [key for key, _, _ in ocean_data.recent_requests(10)]
+
+    assert keys == [("marine", 32.7, -117.15, 3), ("tides", "9410230", today, 3)]
+    assert ("tides", "9410230", "20240101", 3) not in ocean_data._history
+
+
+def test_last_good_payload_survives_a_restart(monkeypatch):
+    run_with_stub(StubUpstreams(), lambda: ocean_data.get_marine_weather(32.7, -117.15))
+    key = ocean_data.marine_request(32.7, -117.15)[0]
+    # restart during an outage: memory is empty and the regular entry has run out
+    monkeypatch.setattr(ocean_data, "ocean_cache", cache.TTLCache())
+    monkeypatch.setattr(ocean_data, "last_good_cache", cache.TTLCache())
+    ocean_data.disk_cache.set(key, {}, 0, 0)
+
+    async def outage(request):
+        return httpx.Response(503)
+    weather = run_with_stub(outage, lambda: ocean_data.get_marine_weather(32.7, -117.15))
+
+    assert weather["stale"] is True
+    assert weather["current"]["wave_height_m"] == 1.2
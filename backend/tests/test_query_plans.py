@@ -0,0 +1,45 @@
+import pytest
+
+import database
+
+# (list function, needs a user id, sort keys of its cursor)
+LIST_QUERIES = [
+    (database.get_all_sightings, False, database.SIGHTING_SORT),
+    (database.get_user_sightings, True, database.SIGHTING_SORT),
+    (database.get_all_beach_reports, False, database.REPORT_SORT),
+    (database.get_user_beach_reports, True, database.REPORT_SORT),
+    (database.get_all_conservation_actions, False, database.ACTION_SORT),
+    (database.get_user_conservation_actions, True, database.ACTION_SORT),
+]
+
+
+def captured_query(fetch, *args, **kwargs):
+    """run a list function, returning the sql and params it sent to execute_query"""
+    calls = []
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(database, "execute_query", lambda query, params=(), **_: calls.append((query, params)) or [])
+        fetch(*args, **kwargs)
+    assert len(calls) == 1
+    return calls[0]
+
+
+def query_plan(query, params):
+    with database.get_db(readonly=True) as conn:
+        return [row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+
+@pytest.mark.parametrize("fetch,per_user,sort_keys", LIST_QUERIES, ids=lambda v: getattr(v, "__name__", None))
+@pytest.mark.parametrize("with_cursor", [False, True], ids=["offset", "cursor"])
+def test_list_queries_use_indexes(db, fetch, per_user, sort_keys, with_cursor):
+    user_id = database.create_user("plan@example.com", "Plan", "x")
+    args = (user_id,) if per_user else ()
+    last_row = {key: 1 if key == "id" else "2024-06-01" for key in sort_keys}
+    cursor = database.encode_cursor(last_row, sort_keys) if with_cursor else None
+
+    query, params = captured_query(fetch, *args, limit=50, cursor=cursor)
+    plan = query_plan(query, params)
+
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    full_scans = [step for step in plan if step.startswith("SCAN") and "USING" not in step]
+    assert not full_scans, plan
+    assert any("USING INDEX idx_" in step for step in plan), plan
@@ -0,0 +1,12 @@
+def test_activity_counts_match_the_tables(db):
+    user_id = db.create_user("diver@example.com", "Diver", "not-a-hash")
+    other = db.create_user("other@example.com", "Other", "not-a-hash")
+    for i in range(3):
+        db.create_marine_sighting(user_id, f"Dolphin {i}", "mammal", "La Jolla", 32.85, -117.27, "2024-06-01")
+    db.create_marine_sighting(other, "Orca", "mammal", "Monterey", 36.6, -121.9, "2024-06-02")
+    db.create_beach_report(other, "La Jolla Shores", 32.86, -117.26, 4, 2, "2024-06-02")
+    db.delete_marine_sighting(1)
+
+    assert db.get_activity_counts() == {"sightings": 3, "reports": 1, "actions": 0}
+    assert db.get_activity_counts(user_id) == {"sightings": 2, "reports": 0, "actions": 0}
+    assert db.get_activity_counts(other) == {"sightings": 1, "reports": 1, "actions": 0}
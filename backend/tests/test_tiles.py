@@ -0,0 +1,67 @@
+import tiles
+
+POINTS = [(32.85, -117.27, "mammal"), (32.86, -117.26, "fish"), (36.6, -121.9, "mammal"), (21.3, -157.8, "bird")]
+ZOOMS = (0, 1, 3, 6, 10)
+
+
+def sorted_clusters(tile):
+    return sorted(((c["layer"], c["count"], c["latitude"], c["longitude"], c["dominant"],
+                   tuple(sorted(c["types"].items()))) for c in tile["clusters"]))
+
+
+def contains_bounds(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+def cached_tiles(latitude, longitude):
+    return [(z, *tiles.tile_for(latitude, longitude, z)) for z in ZOOMS]
+
+
+def add(db, user_id, latitude, longitude, species_type):
+    row = db.create_marine_sighting(user_id, "Whatever", species_type, "Somewhere", latitude, longitude, "2024-06-01")
+    tiles.update_point("sightings", row, 1)
+    return row
+
+
+def test_writes_patch_cached_tiles_to_match_a_rebuild(db):
+    tiles.invalidate_all()
+    user_id = db.create_user("diver@example.com", "Diver", "not-a-hash")
+    add(db, user_id, *POINTS[0])
+    keys = cached_tiles(32.85, -117.27)
+    for key in keys:
+        tiles.get_tile(*key)
+
+    rows = [add(db, user_id, *point) for point in POINTS[1:]]
+    db.delete_marine_sighting(rows[0]["id"])
+    tiles.update_point("sightings", rows[0], -1)
+
+    for key in keys:
+        # still cached (patched, not dropped) and equal to a fresh aggregate
+        assert tiles.tile_cache.peek(key) is not None
+        patched, fresh = tiles.get_tile(*key), tiles.render_tile(tiles.build_tile(*key))
+        assert sorted_clusters(patched) == sorted_clusters(fresh)
+        # a delete may leave a cell's extent wider than a rebuild would, never narrower
+        extents = {(c["layer"], c["latitude"], c["longitude"]): c["bounds"] for c in patched["clusters"]}
+        assert all(contains_bounds(extents[(c["layer"], c["latitude"], c["longitude"])], c["bounds"])
+                   for c in fresh["clusters"])
+    tiles.invalidate_all()
+
+
+def test_cell_index_matches_the_query_bucketing(db):
+    tiles.invalidate_all()
+    user_id = db.create_user("diver@example.com", "Diver", "not-a-hash")
+    points = [(lat / 7, lon / 3) for lat in range(-500, 500, 37) for lon in range(-500, 500, 41)]
+    for latitude, longitude in points:
+        db.create_marine_sighting(user_id, "Whatever", "mammal", "Somewhere", latitude, longitude, "2024-06-01")
+
+    for z in (0, 2, 4):
+        for x in range(2 ** z):
+            for y in range(2 ** z):
+                tile = tiles.build_tile(z, x, y)
+                expected = {key[1:]: cell["count"] for key, cell in tile["cells"].items()}
+                counted = {}
+                for latitude, longitude in points:
+                    if tiles._contains(tile["bounds"], latitude, longitude):
+                        cell = tiles._cell_index(tile, latitude, longitude)
+                        counted[cell] = counted.get(cell, 0) + 1
+                assert counted == expected
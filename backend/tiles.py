@@ -0,0 +1,164 @@
+import math
+import threading
+from typing import Optional, Tuple
+import database
+from cache import TTLCache
+
+# TILE CONFIGS
+MAX_ZOOM = 18
+CLUSTER_GRID = 8  # clusters per tile side (up to CLUSTER_GRID^2 cells per layer)
+TILE_CACHE_TTL = 300  # seconds; writes invalidate the affected tiles sooner
+TILE_CACHE_MAX_ENTRIES = 4096
+
+# map layer -> (table, column reported as the cluster's dominant value)
+LAYERS = {
+    "sightings": ("marine_sightings", "species_type"),
+    "beach_reports": ("beach_reports", "beach_name"),
+    "conservation_actions": ("conservation_actions", "action_type"),
+}
+
+tile_cache = TTLCache(TILE_CACHE_MAX_ENTRIES)
+_tiles_lock = threading.Lock()  # cached tiles are patched in place by writes
+
+
+# WEB MERCATOR (slippy map) TILE MATH
+def tile_latitude(z: int, y: float) -> float:
+    """latitude of the northern edge of tile row y (fractional rows allowed)"""
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / 2 ** z))))
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) of a tile"""
+    n = 2 ** z
+    return x / n * 360 - 180, tile_latitude(z, y + 1), (x + 1) / n * 360 - 180, tile_latitude(z, y)
+
+def tile_for(latitude: float, longitude: float, z: int) -> Optional[Tuple[int, int]]:
+    """(x, y) of the tile holding a point, None outside the mercator range"""
+    if abs(latitude) >= 85.0511:
+        return None
+    n = 2 ** z
+    x = min(n - 1, int((longitude + 180) / 360 * n))
+    lat = math.radians(latitude)
+    y = min(n - 1, int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n))
+    return x, y
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+# CLUSTERING
+# cached tiles hold per-cell aggregates, so a write can be applied to them in place
+def _contains(bounds: Tuple[float, float, float, float], latitude: float, longitude: float) -> bool:
+    """same edge rules as database.get_tile_cells: south / east edges exclusive (east inclusive at 180)"""
+    min_lon, min_lat, max_lon, max_lat = bounds
+    east_ok = longitude <= max_lon if max_lon >= 180 else longitude < max_lon
+    return min_lat < latitude <= max_lat and min_lon <= longitude and east_ok
+
+def _cell_index(tile: dict, latitude: float, longitude: float) -> Tuple[int, int]:
+    """(cx, cy) grid cell of a point inside a tile, bucketed exactly like get_tile_cells"""
+    min_lon, _, max_lon, _ = tile["bounds"]
+    width = (max_lon - min_lon) / CLUSTER_GRID
+    cx = min(CLUSTER_GRID - 1, int((longitude - min_lon) / width))
+    cy = sum(1 for edge in tile["lat_edges"] if latitude < edge)
+    return cx, cy
+
+def build_tile(z: int, x: int, y: int) -> dict:
+    """per-layer cell aggregates on a CLUSTER_GRID x CLUSTER_GRID grid over the tile"""
+    bounds = tile_bounds(z, x, y)
+    # interior row edges, north to south, evenly spaced in mercator (not latitude)
+    lat_edges = [tile_latitude(z, y + row / CLUSTER_GRID) for row in range(1, CLUSTER_GRID)]
+
+    cells = {}
+    for layer, (table, type_column) in LAYERS.items():
+        for row in database.get_tile_cells(table, type_column, bounds, CLUSTER_GRID, lat_edges):
+            cell = cells.setdefault((layer, row["cx"], row["cy"]), {
+                "count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "types": {},
+                "bounds": [row["min_lon"], row["min_lat"], row["max_lon"], row["max_lat"]]
+            })
+            cell["count"] += row["count"]
+            cell["lat_sum"] += row["lat_sum"]
+            cell["lon_sum"] += row["lon_sum"]
+            cell["types"][row["type"]] = row["count"]
+            b = cell["bounds"]
+            b[0], b[1] = min(b[0], row["min_lon"]), min(b[1], row["min_lat"])
+            b[2], b[3] = max(b[2], row["max_lon"]), max(b[3], row["max_lat"])
+
+    return {"z": z, "x": x, "y": y, "bounds": bounds, "lat_edges": lat_edges, "cells": cells}
+
+def render_tile(tile: dict) -> dict:
+    """clusters of every layer from a tile's cell aggregates"""
+    clusters = []
+    for (layer, _, _), cell in tile["cells"].items():
+        clusters.append({
+            "layer": layer,
+            "count": cell["count"],
+            "latitude": round(cell["lat_sum"] / cell["count"], 6),
+            "longitude": round(cell["lon_sum"] / cell["count"], 6),
+            "bounds": list(cell["bounds"]),
+            "dominant": max(cell["types"].items(), key=lambda item: (item[1], item[0]))[0],
+            "types": dict(cell["types"])
+        })
+    return {"z": tile["z"], "x": tile["x"], "y": tile["y"], "bounds": list(tile["bounds"]), "clusters": clusters}
+
+def get_tile(z: int, x: int, y: int) -> dict:
+    """clustered tile, aggregated once and then served (and kept current) from tile_cache"""
+    tile, _ = tile_cache.get((z, x, y))
+    if tile is None:
+        tile = build_tile(z, x, y)
+        tile_cache.set((z, x, y), tile, TILE_CACHE_TTL)
+    with _tiles_lock:
+        return render_tile(tile)
+
+
+# WRITES
+def _apply(tile: dict, layer: str, type_value, latitude: float, longitude: float, delta: int) -> bool:
+    """add (delta 1) or remove (delta -1) one row in a cached tile, False if it must be rebuilt"""
+    key = (layer, *_cell_index(tile, latitude, longitude))
+    cell = tile["cells"].get(key)
+    if delta > 0:
+        if cell is None:
+            cell = tile["cells"][key] = {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "types": {},
+                                         "bounds": [longitude, latitude, longitude, latitude]}
+        b = cell["bounds"]
+        b[0], b[1] = min(b[0], longitude), min(b[1], latitude)
+        b[2], b[3] = max(b[2], longitude), max(b[3], latitude)
+    else:
+        # counts, types and centroid stay exact; the extent is only re-tightened when the tile expires
+        if cell is None or cell["types"].get(type_value, 0) < 1:
+            return False
+    cell["count"] += delta
+    cell["lat_sum"] += delta * latitude
+    cell["lon_sum"] += delta * longitude
+    cell["types"][type_value] = cell["types"].get(type_value, 0) + delta
+    if not cell["types"][type_value]:
+        del cell["types"][type_value]
+    if not cell["count"]:
+        del tile["cells"][key]
+    return True
+
+def update_point(layer: str, row, delta: int):
+    """apply a created (delta 1) / deleted (delta -1) row to every cached tile that holds it
+    cached low-zoom tiles cover most of the table, so they are patched rather than re-aggregated"""
+    latitude, longitude = row["latitude"], row["longitude"]
+    if latitude is None or longitude is None:
+        return
+    type_value = row[LAYERS[layer][1]]
+    for z in range(MAX_ZOOM + 1):
+        xy = tile_for(latitude, longitude, z)
+        if xy is None:
+            return
+        # neighbours too: a point on a tile edge belongs to whichever tile the query's edge rules pick
+        for x in range(xy[0] - 1, xy[0] + 2):
+            for y in range(xy[1] - 1, xy[1] + 2):
+                tile = tile_cache.peek((z, x, y))
+                if tile is None or not _contains(tile["bounds"], latitude, longitude):
+                    continue
+                with _tiles_lock:
+                    applied = _apply(tile, layer, type_value, latitude, longitude, delta)
+                if not applied:
+                    tile_cache.delete((z, x, y))
+
+def invalidate_all():
+    tile_cache.clear()
+
+def cache_stats() -> dict:
+    return tile_cache.stats()
@@ -7,7 +7,7 @@ import { GiShrimp, GiJellyfish, GiWhaleTail, GiDolphin, GiTurtle } from 'react-i
 import { MdWaves } from 'react-icons/md';
 import StatsCard from './StatsCard';
 import RecentSightings from './RecentSightings';
-import { statsAPI, sightingsAPI, reportsAPI, actionsAPI } from '../../services/api';
+import { dashboardAPI } from '../../services/api';
 
 const oceanFacts = [
   { fact: "The ocean produces over 50% of the world's oxygen and absorbs 25% of all carbon dioxide emissions.", icon: "🌊" },
@@ -58,22 +58,14 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [communityStats, allSightings, allReports, allActions] = await Promise.all([
-      statsAPI.getCommunityStats(),
-      sightingsAPI.getAll({ limit: 100 }),
-      reportsAPI.getAll({ limit: 100 }),
-      actionsAPI.getAll({ limit: 100 }),
-    ]);
+      const { data } = await dashboardAPI.get();
+    setStats(data.community);
 
-    // filter out the own current user data
-    setUserStats({
-      sightings: allSightings.data.filter(s => s.user_name === user.name).length,
-      reports: allReports.data.filter(r => r.user_name === user.name).length,
-      actions: allActions.data.filter(a => a.user_name === user.name).length,
-    });
+    // current user's totals
+    setUserStats(data.user);
     
     // show recent community sightings (latest 5)
-    setRecentSightings(allSightings.data.slice(0, 5));
+    setRecentSightings(data.recent_sightings);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
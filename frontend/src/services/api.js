@@ -65,9 +65,30 @@ export const oceanDataAPI = {
   getConditions: (locationName, latitude, longitude, days) => api.get('/ocean-data/conditions', { params: { location_name: locationName, latitude, longitude, days } }),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  get: () => api.get('/dashboard'),
+};
+
+// Map API
+export const mapAPI = {
+  getTile: (z, x, y, layers) => api.get(`/map/tiles/${z}/${x}/${y}`, { params: { layers } }),
+};
+
+// Search API
+export const searchAPI = {
+  search: (q, params) => api.get('/search', { params: { q, ...params } }),
+};
+
+// Export API
+export const exportAPI = {
+  url: (resource, params) => `${API_URL}/export/${resource}?${new URLSearchParams(params)}`,
+};
+
 // Stats API
 export const statsAPI = {
   getCommunityStats: () => api.get('/stats/community'),
+  getTimeseries: (params) => api.get('/stats/timeseries', { params }),
 };
 
 export default api;
\ No newline at end of file